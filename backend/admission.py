@@ -0,0 +1,246 @@
+import asyncio
+import collections
+import functools
+import itertools
+import math
+import threading
+import time
+
+from flask import g, jsonify
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request can't be admitted; carries a Retry-After hint"""
+
+    def __init__(self, lane, retry_after):
+        super().__init__(f'{lane} lane is full')
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+def _wake(wakeup):
+    if not wakeup.done():
+        wakeup.set_result(None)
+
+
+class AdmissionController:
+    """
+    Caps in-flight resume processing, counted in documents
+
+    Two priority lanes share max_documents permits. The interactive lane
+    (single-resume analysis) is always served before queued bulk work, and
+    interactive_reserved permits are never handed to bulk requests, so a
+    few large uploads can't starve cheap calls. Each lane has a bounded
+    queue; requests that don't fit, or that wait longer than queue_timeout,
+    are rejected so the caller can answer 429 instead of degrading everyone.
+
+    Limits are per process; with N pre-forked workers the host-wide cap is
+    N times max_documents.
+    """
+
+    def __init__(self, max_documents, interactive_reserved, max_queued, queue_timeout):
+        self.max_documents = max_documents
+        self.bulk_limit = max(1, max_documents - interactive_reserved)
+        self.max_queued = dict(max_queued)
+        self.queue_timeout = queue_timeout
+
+        self._condition = threading.Condition()
+        # Permits held, and the real documents behind them (a request
+        # bigger than its lane holds fewer permits than it has documents)
+        self._in_flight = {INTERACTIVE: 0, BULK: 0}
+        self._in_flight_documents = {INTERACTIVE: 0, BULK: 0}
+        self._waiting = {INTERACTIVE: collections.deque(), BULK: collections.deque()}
+        self._queued_documents = {INTERACTIVE: 0, BULK: 0}
+        self._tickets = itertools.count()
+        # (loop, future) of acquire_async callers, woken on every change
+        self._async_waiters = []
+
+        # Moving average of seconds per document, for Retry-After
+        self._seconds_per_document = 1.0
+        self._admitted = {INTERACTIVE: 0, BULK: 0}
+        self._rejected = {INTERACTIVE: 0, BULK: 0}
+
+    def _lane_limit(self, lane):
+        return self.max_documents if lane == INTERACTIVE else self.bulk_limit
+
+    def _can_admit(self, lane, documents, ticket):
+        if self._waiting[lane][0] != ticket:
+            return False
+        if lane == BULK and self._waiting[INTERACTIVE]:
+            return False
+        total = self._in_flight[INTERACTIVE] + self._in_flight[BULK]
+        if total + documents > self.max_documents:
+            return False
+        return lane == INTERACTIVE or self._in_flight[BULK] + documents <= self.bulk_limit
+
+    def _retry_after(self, lane):
+        backlog = sum(self._in_flight_documents.values()) + self._queued_documents[lane]
+        if lane == BULK:
+            backlog += self._queued_documents[INTERACTIVE]
+        seconds = backlog * self._seconds_per_document / self.max_documents
+        return max(1, math.ceil(seconds))
+
+    def _reject(self, lane):
+        self._rejected[lane] += 1
+        return AdmissionRejected(lane, self._retry_after(lane))
+
+    def _enqueue(self, lane, documents):
+        queued = self._queued_documents[lane]
+        # An empty queue always takes one request, however large
+        if queued and queued + documents > self.max_queued[lane]:
+            raise self._reject(lane)
+        ticket = next(self._tickets)
+        self._waiting[lane].append(ticket)
+        self._queued_documents[lane] += documents
+        return ticket
+
+    def _leave_queue(self, lane, ticket, documents):
+        self._waiting[lane].remove(ticket)
+        self._queued_documents[lane] -= documents
+        # Our leaving may unblock whoever is now at the head
+        self._notify_all()
+
+    def _admit(self, lane, permits, documents):
+        self._in_flight[lane] += permits
+        self._in_flight_documents[lane] += documents
+        self._admitted[lane] += 1
+
+    def _notify_all(self):
+        self._condition.notify_all()
+        for loop, wakeup in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, wakeup)
+            except RuntimeError:
+                pass  # loop already closed
+        self._async_waiters.clear()
+
+    def acquire(self, lane, documents):
+        """
+        Block until admitted; returns the permits held. Raises AdmissionRejected.
+
+        The queue bound counts the request's real documents. Only the
+        permits are capped at the lane limit, so a request bigger than its
+        lane still gets in, just on its own. Pass the same documents to
+        release().
+        """
+        documents = max(1, documents)
+        permits = min(documents, self._lane_limit(lane))
+
+        with self._condition:
+            ticket = self._enqueue(lane, documents)
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while not self._can_admit(lane, permits, ticket):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject(lane)
+                    self._condition.wait(remaining)
+            finally:
+                self._leave_queue(lane, ticket, documents)
+
+            self._admit(lane, permits, documents)
+            return permits
+
+    async def acquire_async(self, lane, documents):
+        """
+        acquire() for asyncio callers
+
+        Waits on a future woken by release() rather than parking an
+        executor thread, so queued requests don't take threads from the
+        blocking work of requests already admitted.
+        """
+        documents = max(1, documents)
+        permits = min(documents, self._lane_limit(lane))
+        loop = asyncio.get_running_loop()
+
+        with self._condition:
+            ticket = self._enqueue(lane, documents)
+        deadline = time.monotonic() + self.queue_timeout
+
+        try:
+            while True:
+                with self._condition:
+                    if self._can_admit(lane, permits, ticket):
+                        # Admitted in the same critical section as leaving
+                        # the queue, and returned without awaiting, so a
+                        # cancellation can't strand the permits
+                        self._leave_queue(lane, ticket, documents)
+                        self._admit(lane, permits, documents)
+                        return permits
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject(lane)
+                    wakeup = loop.create_future()
+                    self._async_waiters.append((loop, wakeup))
+                try:
+                    await asyncio.wait_for(wakeup, remaining)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._condition:
+                self._leave_queue(lane, ticket, documents)
+            raise
+
+    def release(self, lane, permits, documents, elapsed=None):
+        """Return permits; elapsed over the real documents feeds the Retry-After estimate"""
+        documents = max(1, documents)
+        with self._condition:
+            self._in_flight[lane] -= permits
+            self._in_flight_documents[lane] -= documents
+            if elapsed is not None:
+                self._seconds_per_document = 0.9 * self._seconds_per_document + \
+                    0.1 * (elapsed / documents)
+            self._notify_all()
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                'max_documents': self.max_documents,
+                'bulk_limit': self.bulk_limit,
+                'in_flight': dict(self._in_flight),
+                'in_flight_documents': dict(self._in_flight_documents),
+                'queued_documents': dict(self._queued_documents),
+                'admitted': dict(self._admitted),
+                'rejected': dict(self._rejected),
+                'seconds_per_document': round(self._seconds_per_document, 3),
+            }
+
+
+def admission_controlled(controller, lane, count_documents=lambda: 1):
+    """
+    Decorate a Flask view so it runs only once admitted; answers 429 otherwise
+
+    The time spent queued is left in g.admission_wait_ms. The wrapper keeps
+    the undecorated view as inner_view, and with_inner_view() rebuilds it
+    around another view, so other wrappers (the profiler) can go inside
+    the queue wait instead of around it.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            queued = time.monotonic()
+            documents = count_documents()
+            try:
+                permits = controller.acquire(lane, documents)
+            except AdmissionRejected as e:
+                response = jsonify({
+                    'error': 'Server busy, please retry later',
+                    'lane': e.lane,
+                    'retry_after': e.retry_after
+                })
+                return response, 429, {'Retry-After': str(e.retry_after)}
+
+            started = time.monotonic()
+            g.admission_wait_ms = round((started - queued) * 1000, 2)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                controller.release(lane, permits, documents, time.monotonic() - started)
+
+        wrapper.inner_view = view
+        wrapper.with_inner_view = decorator
+        return wrapper
+    return decorator
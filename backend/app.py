@@ -1,43 +1,204 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import get_input_stream
+from urllib.parse import unquote
+import math
 import os
 
 from resume_parser import ResumeParser
+from parsed_resume import ParsedResume
 from skill_extractor import SkillExtractor
 from matcher_bert import BERTResumeMatcher
 from skill_gap_analyzer import SkillGapAnalyzer
 from roadmap_generator import RoadmapGenerator
 from explainer import ExplainableAI
 from ats_scorer import ATSScorer
+from zip_stream import iter_zip_members, ZipStreamError
+from profiling import RequestProfiler
+from admission import AdmissionController, admission_controlled, INTERACTIVE, BULK
+from skill_coverage import SkillCoverageMatrix, CandidatePoolStore
+from compression import init_compression
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
+init_compression(app)  # gzip/zstd negotiated via Accept-Encoding
 
 # Configuration
-app.config['UPLOAD_FOLDER'] = 'uploads/'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
-# Create uploads directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Per-candidate keys of /api/upload-resumes, selectable with ?fields=
+CANDIDATE_FIELDS = ('filename', 'candidate_name', 'email', 'phone', 'skills', 'experience',
+                    'education', 'match_score', 'ats_score', 'ats_breakdown', 'skill_gaps',
+                    'roadmap', 'explanation')
+
+# ZIP archives posted as the raw body of /api/upload-resumes
+ZIP_MIMETYPES = {'application/zip', 'application/x-zip-compressed'}
+app.config['MAX_ARCHIVE_LENGTH'] = 2 * 1024 * 1024 * 1024  # 2GB max
+app.config['MAX_ARCHIVE_MEMBER_SIZE'] = 10 * 1024 * 1024  # 10MB per resume
+
+# Micro-batching of concurrent encode calls
+app.config['ENCODER_MAX_BATCH_SIZE'] = int(os.environ.get('ENCODER_MAX_BATCH_SIZE', 64))
+app.config['ENCODER_MAX_WAIT_MS'] = float(os.environ.get('ENCODER_MAX_WAIT_MS', 5.0))
+
+# Opt-in request profiling: off, header (X-Profile-Request: 1) or always
+app.config['PROFILING_MODE'] = os.environ.get('PROFILING_MODE', 'off')
+app.config['PROFILING_SAMPLE_RATE'] = float(os.environ.get('PROFILING_SAMPLE_RATE', 1.0))
+app.config['PROFILING_DIR'] = os.environ.get('PROFILING_DIR', 'profiles/')
+
+# Screened pools for /api/pools, shared by every server worker through this directory
+app.config['POOLS_DIR'] = os.environ.get('POOLS_DIR', 'pools/')
+
+# Admission control, counted in documents in flight per process
+app.config['ADMISSION_MAX_DOCUMENTS'] = int(os.environ.get('ADMISSION_MAX_DOCUMENTS', 2 * (os.cpu_count() or 1)))
+app.config['ADMISSION_INTERACTIVE_RESERVED'] = int(os.environ.get(
+    'ADMISSION_INTERACTIVE_RESERVED', max(1, app.config['ADMISSION_MAX_DOCUMENTS'] // 4)))
+app.config['ADMISSION_MAX_QUEUED_INTERACTIVE'] = int(os.environ.get('ADMISSION_MAX_QUEUED_INTERACTIVE', 32))
+app.config['ADMISSION_MAX_QUEUED_BULK'] = int(os.environ.get('ADMISSION_MAX_QUEUED_BULK', 200))
+app.config['ADMISSION_QUEUE_TIMEOUT'] = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 30))
+app.config['ADMISSION_ZIP_BYTES_PER_DOCUMENT'] = 200 * 1024  # estimate before the archive is read
 
 # Initialize components
 resume_parser = ResumeParser()
 skill_extractor = SkillExtractor()
-matcher = BERTResumeMatcher()
+matcher = BERTResumeMatcher(app.config['ENCODER_MAX_BATCH_SIZE'],
+                            app.config['ENCODER_MAX_WAIT_MS'])
 skill_gap_analyzer = SkillGapAnalyzer()
 roadmap_generator = RoadmapGenerator()
 explainer = ExplainableAI()
 ats_scorer = ATSScorer()
+admission = AdmissionController(
+    app.config['ADMISSION_MAX_DOCUMENTS'],
+    app.config['ADMISSION_INTERACTIVE_RESERVED'],
+    {INTERACTIVE: app.config['ADMISSION_MAX_QUEUED_INTERACTIVE'],
+     BULK: app.config['ADMISSION_MAX_QUEUED_BULK']},
+    app.config['ADMISSION_QUEUE_TIMEOUT'])
+candidate_pools = CandidatePoolStore(app.config['POOLS_DIR'])
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def count_uploaded_resumes():
+    """Documents in a batch upload; ZIP archives are estimated from their size"""
+    if request.mimetype in ZIP_MIMETYPES:
+        return math.ceil((request.content_length or 0) /
+                         app.config['ADMISSION_ZIP_BYTES_PER_DOCUMENT'])
+    return len(request.files.getlist('resumes'))
+
+def parse_fields_arg(fields):
+    """Per-candidate keys requested via ?fields=a,b,c; None means all"""
+    if not fields:
+        return None
+    
+    fields = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = fields - set(CANDIDATE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+def parse_top_k(value):
+    """top_k from a query, form or JSON value; raises ValueError unless a positive integer"""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError('top_k must be a positive integer')
+    return value
+
+def analyze_resume(filename, resume_text, job_description, fields=None, candidate_data=None):
+    """
+    Run the screening pipeline on one resume
+    
+    With a fields set, stages whose output isn't requested (ATS breakdown,
+    skill gaps, roadmap, explanation) are skipped. Identity, skills and
+    match score are always computed since ranking and the candidate pool
+    need them. candidate_data may be passed in when extraction already ran
+    elsewhere (the async server does it in a process pool).
+    """
+    def wanted(*keys):
+        return fields is None or any(key in fields for key in keys)
+    
+    parsed = ParsedResume(resume_text)
+    if candidate_data is None:
+        candidate_data = skill_extractor.extract_candidate_info(parsed)
+    match_score, breakdown = matcher.calculate_similarity_with_breakdown(parsed, job_description)
+    
+    result = {
+        'filename': filename,
+        'candidate_name': candidate_data.get('name', 'Unknown'),
+        'email': candidate_data.get('email', 'N/A'),
+        'phone': candidate_data.get('phone', 'N/A'),
+        'skills': candidate_data.get('skills', []),
+        'experience': candidate_data.get('experience', []),
+        'education': candidate_data.get('education', []),
+        'match_score': round(match_score * 100, 2)
+    }
+    
+    if wanted('explanation'):
+        result['explanation'] = explainer.explain_score_with_bert(
+            resume_text, job_description, match_score, matcher, breakdown)
+    if wanted('ats_score', 'ats_breakdown'):
+        ats_score, ats_breakdown = ats_scorer.calculate_ats_score(parsed, candidate_data)
+        result['ats_score'] = round(ats_score, 2)
+        result['ats_breakdown'] = ats_breakdown
+    if wanted('skill_gaps', 'roadmap'):
+        result['skill_gaps'] = skill_gap_analyzer.identify_gaps(candidate_data['skills'], job_description)
+    if wanted('roadmap'):
+        result['roadmap'] = roadmap_generator.generate_roadmap(result['skill_gaps'])
+    
+    return result
+
+def analyze_student_resume(resume_text, target_role, candidate_data=None):
+    """ATS score, plus skill gaps and roadmap towards target_role, for the student dashboard"""
+    parsed = ParsedResume(resume_text)
+    if candidate_data is None:
+        candidate_data = skill_extractor.extract_candidate_info(parsed)
+    ats_score, ats_breakdown = ats_scorer.calculate_ats_score(parsed, candidate_data)
+    
+    if target_role:
+        skill_gaps = skill_gap_analyzer.identify_gaps_by_role(candidate_data['skills'], target_role)
+        roadmap = roadmap_generator.generate_roadmap(skill_gaps)
+    else:
+        skill_gaps = []
+        roadmap = []
+    
+    return {
+        'success': True,
+        'candidate_data': candidate_data,
+        'ats_score': round(ats_score, 2),
+        'ats_breakdown': ats_breakdown,
+        'skill_gaps': skill_gaps,
+        'roadmap': roadmap
+    }
+
+def project_candidates(results, fields):
+    if fields is None:
+        return results
+    return [{key: value for key, value in result.items() if key in fields} for result in results]
+
+def register_pool(results, job_description):
+    """Build the candidates x skills matrix for a screened batch and keep it for queries"""
+    pool = SkillCoverageMatrix(
+        [{'filename': r['filename'], 'candidate_name': r['candidate_name'],
+          'match_score': r['match_score']} for r in results],
+        [r['skills'] for r in results],
+        skill_extractor.all_skills,
+        skill_extractor.extract_skills(job_description))
+    return candidate_pools.add(pool)
+
 @app.route('/api/upload-resumes', methods=['POST'])
+@admission_controlled(admission, BULK, count_uploaded_resumes)
 def upload_resumes():
     """Upload multiple resumes and job description"""
     try:
+        try:
+            fields = parse_fields_arg(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if request.mimetype in ZIP_MIMETYPES:
+            return upload_resume_archive(fields)
+        
         if 'resumes' not in request.files:
             return jsonify({'error': 'No resumes provided'}), 400
         
@@ -51,48 +212,77 @@ def upload_resumes():
         for file in files:
             if file and allowed_file(file.filename):
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                
-                # Process resume
-                resume_text = resume_parser.extract_text(filepath)
-                candidate_data = skill_extractor.extract_candidate_info(resume_text)
-                match_score = matcher.calculate_similarity(resume_text, job_description)
-                ats_score, ats_breakdown = ats_scorer.calculate_ats_score(resume_text, candidate_data)
-                skill_gaps = skill_gap_analyzer.identify_gaps(candidate_data['skills'], job_description)
-                roadmap = roadmap_generator.generate_roadmap(skill_gaps)
-                explanation = explainer.explain_score_with_bert(resume_text, job_description, match_score, matcher)
                 
-                results.append({
-                    'filename': filename,
-                    'candidate_name': candidate_data.get('name', 'Unknown'),
-                    'email': candidate_data.get('email', 'N/A'),
-                    'phone': candidate_data.get('phone', 'N/A'),
-                    'skills': candidate_data.get('skills', []),
-                    'experience': candidate_data.get('experience', []),
-                    'education': candidate_data.get('education', []),
-                    'match_score': round(match_score * 100, 2),
-                    'ats_score': round(ats_score, 2),
-                    'ats_breakdown': ats_breakdown,
-                    'skill_gaps': skill_gaps,
-                    'roadmap': roadmap,
-                    'explanation': explanation
-                })
-                
-                os.remove(filepath)  # Clean up
+                # Parsed in memory; concurrent uploads may share a filename
+                resume_text = resume_parser.extract_text_from_bytes(file.read(), filename)
+                results.append(analyze_resume(filename, resume_text, job_description, fields))
         
         results.sort(key=lambda x: x['match_score'], reverse=True)
         
         return jsonify({
             'success': True,
-            'candidates': results,
-            'total_candidates': len(results)
+            'candidates': project_candidates(results, fields),
+            'total_candidates': len(results),
+            'pool_id': register_pool(results, job_description)
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def upload_resume_archive(fields=None):
+    """
+    Screen resumes from a ZIP archive sent as the raw request body
+    
+    The body is read straight from the WSGI input and members are inflated
+    one at a time into memory, so nothing is spooled to disk and memory is
+    bounded by MAX_ARCHIVE_MEMBER_SIZE rather than the archive size. The
+    job description comes from the job_description query parameter or a
+    URL-encoded X-Job-Description header.
+    """
+    job_description = (request.args.get('job_description') or
+                       unquote(request.headers.get('X-Job-Description', '')))
+    if not job_description:
+        return jsonify({'error': 'Job description required'}), 400
+    
+    # Bypass MAX_CONTENT_LENGTH, which is sized for multipart uploads
+    stream = get_input_stream(request.environ,
+                              max_content_length=app.config['MAX_ARCHIVE_LENGTH'])
+    results = []
+    skipped = []
+    # Sizes of the inflated resumes, for the request profiler
+    g.archive_document_sizes = []
+    
+    try:
+        for member in iter_zip_members(stream, app.config['MAX_ARCHIVE_MEMBER_SIZE'],
+                                       ALLOWED_EXTENSIONS):
+            filename = secure_filename(os.path.basename(member.filename))
+            if member.error:
+                skipped.append({'filename': filename, 'error': member.error})
+                continue
+            g.archive_document_sizes.append(len(member.data))
+            
+            try:
+                resume_text = resume_parser.extract_text_from_bytes(member.data, filename)
+            except Exception as e:
+                skipped.append({'filename': filename, 'error': str(e)})
+                continue
+            
+            results.append(analyze_resume(filename, resume_text, job_description, fields))
+    except ZipStreamError as e:
+        return jsonify({'error': f'Invalid ZIP archive: {e}'}), 400
+    
+    results.sort(key=lambda x: x['match_score'], reverse=True)
+    
+    return jsonify({
+        'success': True,
+        'candidates': project_candidates(results, fields),
+        'total_candidates': len(results),
+        'skipped_files': skipped,
+        'pool_id': register_pool(results, job_description)
+    })
+
 @app.route('/api/analyze-single', methods=['POST'])
+@admission_controlled(admission, INTERACTIVE)
 def analyze_single():
     """Analyze single resume for student dashboard"""
     try:
@@ -104,39 +294,116 @@ def analyze_single():
         
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            resume_text = resume_parser.extract_text(filepath)
-            candidate_data = skill_extractor.extract_candidate_info(resume_text)
-            ats_score, ats_breakdown = ats_scorer.calculate_ats_score(resume_text, candidate_data)
+            resume_text = resume_parser.extract_text_from_bytes(file.read(), filename)
+            result = analyze_student_resume(resume_text, target_role)
             
-            if target_role:
-                skill_gaps = skill_gap_analyzer.identify_gaps_by_role(candidate_data['skills'], target_role)
-                roadmap = roadmap_generator.generate_roadmap(skill_gaps)
-            else:
-                skill_gaps = []
-                roadmap = []
+            return jsonify(result)
             
-            os.remove(filepath)
-            
-            return jsonify({
-                'success': True,
-                'candidate_data': candidate_data,
-                'ats_score': round(ats_score, 2),
-                'ats_breakdown': ats_breakdown,
-                'skill_gaps': skill_gaps,
-                'roadmap': roadmap
-            })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/best-fit-roles', methods=['POST'])
+@admission_controlled(admission, INTERACTIVE)
+def best_fit_roles():
+    """Rank every catalogue role by readiness for a skill list or resume"""
+    try:
+        payload = {} if 'resume' in request.files else (request.get_json(silent=True) or {})
+        try:
+            top_k = parse_top_k(payload.get('top_k', request.args.get('top_k', request.form.get('top_k', 5))))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if 'resume' in request.files:
+            file = request.files['resume']
+            if not (file and allowed_file(file.filename)):
+                return jsonify({'error': 'Unsupported file format'}), 400
             
+            filename = secure_filename(file.filename)
+            resume_text = resume_parser.extract_text_from_bytes(file.read(), filename)
+            candidate_skills = skill_extractor.extract_candidate_info(ParsedResume(resume_text))['skills']
+        else:
+            candidate_skills = payload.get('skills')
+            if not isinstance(candidate_skills, list):
+                return jsonify({'error': 'Provide a resume file or a JSON skills list'}), 400
+        
+        return jsonify({
+            'success': True,
+            'skills': candidate_skills,
+            'best_fit_roles': skill_gap_analyzer.best_fit_roles(candidate_skills, top_k)
+        })
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def parse_skills_arg():
+    skills = request.args.get('skills')
+    if skills is None:
+        return None
+    return [skill.strip() for skill in skills.split(',') if skill.strip()]
+
+@app.route('/api/pools/<pool_id>/coverage', methods=['GET'])
+def pool_coverage(pool_id):
+    """Skill coverage and co-occurrence across a screened applicant pool"""
+    pool = candidate_pools.get(pool_id)
+    if pool is None:
+        return jsonify({'error': 'Pool not found'}), 404
+    
+    skills = parse_skills_arg()
+    try:
+        return jsonify({
+            'success': True,
+            'total_candidates': len(pool.candidates),
+            'jd_skills': pool.jd_skills,
+            'coverage': pool.coverage(skills),
+            'co_occurrence': pool.co_occurrence(skills)
+        })
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 400
+
+@app.route('/api/pools/<pool_id>/candidates', methods=['GET'])
+def pool_candidates(pool_id):
+    """Candidates in a pool having all of the given skills"""
+    pool = candidate_pools.get(pool_id)
+    if pool is None:
+        return jsonify({'error': 'Pool not found'}), 404
+    
+    skills = parse_skills_arg() or []
+    try:
+        limit = int(request.args.get('limit', 100))
+        if limit < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({'error': 'limit must be a non-negative integer'}), 400
+    try:
+        indices = pool.candidates_with_all(skills)
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 400
+    
+    return jsonify({
+        'success': True,
+        'skills': skills,
+        'matching_candidates': len(indices),
+        'candidates': [pool.candidates[i] for i in indices[:limit]]
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'Backend running successfully!'}), 200
 
+@app.route('/api/metrics/encoder', methods=['GET'])
+def encoder_metrics():
+    """Batch-size distribution and queueing delay of the batching encoder"""
+    return jsonify(matcher.encoder.get_metrics()), 200
+
+@app.route('/api/metrics/admission', methods=['GET'])
+def admission_metrics():
+    """In-flight and queued documents per priority lane"""
+    return jsonify(admission.get_stats()), 200
+
+# Must run after the routes above are registered
+RequestProfiler(app).install(app, ['upload_resumes', 'analyze_single', 'best_fit_roles'])
+
 if __name__ == '__main__':
     print("Starting Flask server on http://localhost:5000")
     app.run(debug=True, port=5000)
@@ -0,0 +1,493 @@
+"""
+Async serving mode: the same API on an asyncio event loop (ASGI)
+
+The Flask views hold a worker thread for the whole upload read, parse and
+inference, so slow clients tie up workers that could be computing. Here
+request bodies are received on the event loop and only then handed to
+executors, stage by stage:
+
+    ResumeParser + SkillExtractor    process pool (PDF parsing and spaCy hold the GIL)
+    match score, ATS, gaps, roadmap  inference threads, whose encode calls are
+                                     batched by the matcher's batch-encoder thread
+    ZIP inflation                    the loop's default thread pool
+
+Admission permits are taken after a multipart body has arrived, so a slow
+upload holds a connection but no permit, and waiting for them is a plain
+await on the loop that holds no thread. The upload and analysis endpoints
+are served natively; every other route (pools, metrics, health) falls
+through to the Flask app unchanged. Request profiling (PROFILING_MODE) only
+covers the Flask routes.
+
+Usage:
+    python asgi_app.py --port 5000 --parser-processes 4
+    uvicorn asgi_app:app --port 5000
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import unquote
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.utils import secure_filename
+
+from resume_parser import ResumeParser
+from parsed_resume import ParsedResume
+from skill_extractor import SkillExtractor
+from admission import AdmissionRejected, INTERACTIVE, BULK
+from compression import compress_body
+from zip_stream import iter_zip_members, ZipStreamError
+
+PARSER_PROCESSES = int(os.environ.get('PARSER_PROCESSES', os.cpu_count() or 1))
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', 4))
+BLOCKING_THREADS = int(os.environ.get('BLOCKING_THREADS', 64))
+
+FORM_MIMETYPES = {'multipart/form-data', 'application/x-www-form-urlencoded'}
+
+# Per-process parsing pipeline, set up by _init_worker
+_worker = {}
+
+# The Flask module (models, config, pipeline) and executors, set up at
+# startup so pool workers importing this module don't load BERT
+_server = {}
+
+
+def _init_worker():
+    _worker['parser'] = ResumeParser()
+    _worker['extractor'] = SkillExtractor()
+
+
+def _parse_resume(data, filename):
+    """Text and candidate info for one uploaded file; runs in a pool worker"""
+    resume_text = _worker['parser'].extract_text_from_bytes(data, filename)
+    return resume_text, _worker['extractor'].extract_candidate_info(ParsedResume(resume_text))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_):
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(BLOCKING_THREADS, thread_name_prefix='blocking'))
+
+    # spawn rather than fork: workers start clean instead of inheriting the
+    # event loop and torch's threads, and never import BERT
+    parse_pool = ProcessPoolExecutor(PARSER_PROCESSES, multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker)
+    inference = ThreadPoolExecutor(INFERENCE_THREADS, thread_name_prefix='inference')
+
+    # Start every worker (and load spaCy in it) before taking traffic
+    await asyncio.gather(*(loop.run_in_executor(parse_pool, os.getpid)
+                           for _ in range(PARSER_PROCESSES)))
+
+    import app as backend
+    _server.update(backend=backend, parse_pool=parse_pool, inference=inference,
+                   wsgi=WSGIMiddleware(backend.app))
+    try:
+        yield
+    finally:
+        parse_pool.shutdown(cancel_futures=True)
+        inference.shutdown(cancel_futures=True)
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+def json_response(request, payload, status_code=200, headers=None):
+    """jsonify() equivalent, compressed per Accept-Encoding like the Flask routes"""
+    body = _server['backend'].app.json.dumps(payload).encode()
+    headers = dict(headers or {})
+
+    if 200 <= status_code < 300:
+        headers['Vary'] = 'Accept-Encoding'
+        body, encoding = compress_body(body, request.headers.get('Accept-Encoding'))
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+
+    return Response(body, status_code, headers, media_type='application/json')
+
+
+def _mimetype(request):
+    return request.headers.get('Content-Type', '').split(';')[0].strip().lower()
+
+
+def _limit_body(request, max_bytes):
+    """The same request, failing with BodyTooLarge once more than max_bytes arrive"""
+    if int(request.headers.get('Content-Length') or 0) > max_bytes:
+        raise BodyTooLarge()
+
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        received += len(message.get('body', b''))
+        if received > max_bytes:
+            raise BodyTooLarge()
+        return message
+
+    return Request(request.scope, receive)
+
+
+async def _receive_form(request):
+    limited = _limit_body(request, _server['backend'].app.config['MAX_CONTENT_LENGTH'])
+    return await limited.form()
+
+
+async def _receive_json(request):
+    """Like request.get_json(silent=True)"""
+    if _mimetype(request) != 'application/json':
+        return None
+    body = await _limit_body(request, _server['backend'].app.config['MAX_CONTENT_LENGTH']).body()
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def _uploads(form, key):
+    return [value for value in form.getlist(key) if not isinstance(value, str)]
+
+
+@contextlib.asynccontextmanager
+async def admitted(lane, documents):
+    """Hold admission permits for the block; raises AdmissionRejected"""
+    admission = _server['backend'].admission
+    permits = await admission.acquire_async(lane, documents)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        admission.release(lane, permits, documents, time.monotonic() - started)
+
+
+async def _run_in(executor, fn, *args):
+    """
+    run_in_executor whose cancellation waits for a call already running
+
+    A cancelled await normally returns at once while the work carries on
+    in the executor, after the caller has given back its admission permits.
+    Calls that haven't started are dropped; running ones are waited out.
+    """
+    future = executor.submit(fn, *args)
+    wrapped = asyncio.wrap_future(future)
+    try:
+        return await asyncio.shield(wrapped)
+    except asyncio.CancelledError:
+        if not future.cancel():
+            await asyncio.gather(wrapped, return_exceptions=True)
+        raise
+
+
+async def _cancel_and_wait(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def parse_upload(data, filename):
+    return await _run_in(_server['parse_pool'], _parse_resume, data, filename)
+
+
+async def run_inference(fn, *args):
+    return await _run_in(_server['inference'], fn, *args)
+
+
+async def _screen_upload(upload, job_description, fields):
+    filename = secure_filename(upload.filename)
+    resume_text, candidate_data = await parse_upload(await upload.read(), filename)
+    return await run_inference(_server['backend'].analyze_resume, filename, resume_text,
+                               job_description, fields, candidate_data)
+
+
+async def upload_resumes(request):
+    """Upload multiple resumes and job description"""
+    backend = _server['backend']
+    try:
+        fields = backend.parse_fields_arg(request.query_params.get('fields'))
+    except ValueError as e:
+        return json_response(request, {'error': str(e)}, 400)
+
+    if _mimetype(request) in backend.ZIP_MIMETYPES:
+        return await upload_resume_archive(request, fields)
+
+    form = await _receive_form(request)
+    files = _uploads(form, 'resumes')
+    if not files:
+        return json_response(request, {'error': 'No resumes provided'}, 400)
+
+    job_description = form.get('job_description', '')
+    if not job_description:
+        return json_response(request, {'error': 'Job description required'}, 400)
+
+    files = [file for file in files if file.filename and backend.allowed_file(file.filename)]
+    async with admitted(BULK, len(files)):
+        tasks = [asyncio.create_task(_screen_upload(file, job_description, fields))
+                 for file in files]
+        try:
+            results = await asyncio.gather(*tasks)
+            results.sort(key=lambda x: x['match_score'], reverse=True)
+
+            return json_response(request, {
+                'success': True,
+                'candidates': backend.project_candidates(results, fields),
+                'total_candidates': len(results),
+                'pool_id': backend.register_pool(results, job_description)
+            })
+        except Exception as e:
+            return json_response(request, {'error': str(e)}, 500)
+        finally:
+            # After a failure the other files are still being screened; stop
+            # them before the permits are given back
+            await _cancel_and_wait(tasks)
+
+
+class _BodyReader:
+    """
+    Blocking file-like view of an ASGI request body, for iter_zip_members
+
+    read() runs on an executor thread and asks the event loop for the next
+    chunk, so the body is still received asynchronously, and no faster than
+    the archive is inflated.
+    """
+
+    def __init__(self, request, loop, max_bytes):
+        self._chunks = request.stream().__aiter__()
+        self._loop = loop
+        self._max_bytes = max_bytes
+        self._received = 0
+        self._buffer = bytearray()
+        self._eof = False
+
+    async def _next_chunk(self):
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read(self, size):
+        while not self._eof and len(self._buffer) < size:
+            chunk = asyncio.run_coroutine_threadsafe(self._next_chunk(), self._loop).result()
+            if chunk is None:
+                self._eof = True
+                break
+            self._received += len(chunk)
+            if self._received > self._max_bytes:
+                raise BodyTooLarge()
+            self._buffer += chunk
+
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+async def _screen_member(data, filename, job_description, fields, skipped, slots):
+    try:
+        resume_text, candidate_data = await parse_upload(data, filename)
+    except Exception as e:
+        skipped.append({'filename': filename, 'error': str(e)})
+        return None
+    finally:
+        # The slot bounds inflated members in memory, so the bytes go with it
+        del data
+        slots.release()
+
+    return await run_inference(_server['backend'].analyze_resume, filename, resume_text,
+                               job_description, fields, candidate_data)
+
+
+async def upload_resume_archive(request, fields):
+    """
+    Screen resumes from a ZIP archive sent as the raw request body
+
+    Members are handed to the parser processes as soon as they're inflated,
+    while the rest of the archive is still arriving. At most two inflated
+    members per parser process are held in memory at once; members waiting
+    for inference keep only their extracted text.
+    """
+    backend = _server['backend']
+    config = backend.app.config
+    job_description = (request.query_params.get('job_description') or
+                       unquote(request.headers.get('X-Job-Description', '')))
+    if not job_description:
+        return json_response(request, {'error': 'Job description required'}, 400)
+
+    loop = asyncio.get_running_loop()
+    documents = math.ceil(int(request.headers.get('Content-Length') or 0) /
+                          config['ADMISSION_ZIP_BYTES_PER_DOCUMENT'])
+
+    async with admitted(BULK, documents):
+        reader = _BodyReader(request, loop, config['MAX_ARCHIVE_LENGTH'])
+        members = iter_zip_members(reader, config['MAX_ARCHIVE_MEMBER_SIZE'],
+                                   backend.ALLOWED_EXTENSIONS)
+        slots = asyncio.Semaphore(2 * PARSER_PROCESSES)
+        tasks = []
+        skipped = []
+
+        try:
+            while True:
+                member = await loop.run_in_executor(None, next, members, None)
+                if member is None:
+                    break
+
+                filename = secure_filename(os.path.basename(member.filename))
+                if member.error:
+                    skipped.append({'filename': filename, 'error': member.error})
+                    continue
+
+                await slots.acquire()
+                tasks.append(asyncio.create_task(
+                    _screen_member(member.data, filename, job_description, fields, skipped, slots)))
+                # The task owns the bytes now; don't keep them while inflating the next
+                member = None
+
+            results = [result for result in await asyncio.gather(*tasks) if result is not None]
+        except ZipStreamError as e:
+            return json_response(request, {'error': f'Invalid ZIP archive: {e}'}, 400)
+        except BodyTooLarge:
+            raise
+        except Exception as e:
+            return json_response(request, {'error': str(e)}, 500)
+        finally:
+            await _cancel_and_wait(tasks)
+
+        results.sort(key=lambda x: x['match_score'], reverse=True)
+
+        return json_response(request, {
+            'success': True,
+            'candidates': backend.project_candidates(results, fields),
+            'total_candidates': len(results),
+            'skipped_files': skipped,
+            'pool_id': backend.register_pool(results, job_description)
+        })
+
+
+async def analyze_single(request):
+    """Analyze single resume for student dashboard"""
+    backend = _server['backend']
+    form = await _receive_form(request)
+
+    async with admitted(INTERACTIVE, 1):
+        try:
+            files = _uploads(form, 'resume')
+            if not files:
+                return json_response(request, {'error': 'No resume provided'}, 400)
+
+            file = files[0]
+            if not (file.filename and backend.allowed_file(file.filename)):
+                return json_response(request, {'error': 'Unsupported file format'}, 400)
+
+            resume_text, candidate_data = await parse_upload(await file.read(),
+                                                             secure_filename(file.filename))
+            result = await run_inference(backend.analyze_student_resume, resume_text,
+                                         form.get('target_role', ''), candidate_data)
+            return json_response(request, result)
+
+        except Exception as e:
+            return json_response(request, {'error': str(e)}, 500)
+
+
+async def best_fit_roles(request):
+    """Rank every catalogue role by readiness for a skill list or resume"""
+    backend = _server['backend']
+    form = await _receive_form(request) if _mimetype(request) in FORM_MIMETYPES else {}
+    payload = (await _receive_json(request) or {}) if not form else {}
+
+    async with admitted(INTERACTIVE, 1):
+        try:
+            try:
+                top_k = backend.parse_top_k(
+                    payload.get('top_k', request.query_params.get('top_k', form.get('top_k', 5))))
+            except ValueError as e:
+                return json_response(request, {'error': str(e)}, 400)
+
+            files = _uploads(form, 'resume') if form else []
+            if files:
+                file = files[0]
+                if not (file.filename and backend.allowed_file(file.filename)):
+                    return json_response(request, {'error': 'Unsupported file format'}, 400)
+
+                _, candidate_data = await parse_upload(await file.read(),
+                                                       secure_filename(file.filename))
+                candidate_skills = candidate_data['skills']
+            else:
+                candidate_skills = payload.get('skills')
+                if not isinstance(candidate_skills, list):
+                    return json_response(
+                        request, {'error': 'Provide a resume file or a JSON skills list'}, 400)
+
+            return json_response(request, {
+                'success': True,
+                'skills': candidate_skills,
+                'best_fit_roles': backend.skill_gap_analyzer.best_fit_roles(candidate_skills, top_k)
+            })
+
+        except Exception as e:
+            return json_response(request, {'error': str(e)}, 500)
+
+
+async def flask_fallback(scope, receive, send):
+    await _server['wsgi'](scope, receive, send)
+
+
+async def admission_rejected(request, e):
+    return json_response(request, {
+        'error': 'Server busy, please retry later',
+        'lane': e.lane,
+        'retry_after': e.retry_after
+    }, 429, {'Retry-After': str(e.retry_after)})
+
+
+async def body_too_large(request, e):
+    return json_response(request, {'error': 'Request body too large'}, 413)
+
+
+app = Starlette(
+    routes=[
+        Route('/api/upload-resumes', upload_resumes, methods=['POST']),
+        Route('/api/analyze-single', analyze_single, methods=['POST']),
+        Route('/api/best-fit-roles', best_fit_roles, methods=['POST']),
+        Mount('/', app=flask_fallback),
+    ],
+    middleware=[
+        # Same open policy as flask-cors' CORS(app)
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+    ],
+    exception_handlers={
+        AdmissionRejected: admission_rejected,
+        BodyTooLarge: body_too_large,
+    },
+    lifespan=lifespan,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the resume screening API on an asyncio event loop')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--parser-processes', type=int, default=PARSER_PROCESSES,
+                        help='Processes running ResumeParser and SkillExtractor')
+    parser.add_argument('--inference-threads', type=int, default=INFERENCE_THREADS,
+                        help='Threads scoring parsed resumes; encoding itself is batched on one thread')
+    args = parser.parse_args()
+
+    # Read back when uvicorn imports asgi_app
+    os.environ['PARSER_PROCESSES'] = str(args.parser_processes)
+    os.environ['INFERENCE_THREADS'] = str(args.inference_threads)
+
+    import uvicorn
+    uvicorn.run('asgi_app:app', host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,21 @@
 import re
 
+from parsed_resume import ParsedResume
+
 class ATSScorer:
     """Calculate ATS compatibility score"""
     
-    def calculate_ats_score(self, resume_text, candidate_data):
+    def calculate_ats_score(self, resume, candidate_data):
         """Calculate comprehensive ATS score"""
+        parsed = ParsedResume.coerce(resume)
         scores = {}
         
         scores['contact_information'] = self._score_contact_info(candidate_data)
         scores['skills_section'] = self._score_skills(candidate_data['skills'])
         scores['experience_section'] = self._score_experience(candidate_data['experience'])
         scores['education_section'] = self._score_education(candidate_data['education'])
-        scores['keyword_optimization'] = self._score_keywords(resume_text)
-        scores['format_structure'] = self._score_format(resume_text)
+        scores['keyword_optimization'] = self._score_keywords(parsed)
+        scores['format_structure'] = self._score_format(parsed)
         
         total_score = sum(scores.values())
         
@@ -51,12 +54,11 @@ class ATSScorer:
     def _score_education(self, education):
         return 15 if len(education) >= 1 else 0
     
-    def _score_keywords(self, resume_text):
+    def _score_keywords(self, parsed):
         important_keywords = ['led', 'managed', 'developed', 'improved', 
                              'achieved', 'designed', 'implemented', 'created']
         
-        text_lower = resume_text.lower()
-        keyword_count = sum(1 for keyword in important_keywords if keyword in text_lower)
+        keyword_count = sum(1 for keyword in important_keywords if keyword in parsed.lower)
         
         if keyword_count >= 8:
             return 15
@@ -66,9 +68,9 @@ class ATSScorer:
             return 5
         return 0
     
-    def _score_format(self, resume_text):
+    def _score_format(self, parsed):
         score = 10
-        word_count = len(resume_text.split())
+        word_count = parsed.word_count
         if word_count < 200 or word_count > 1500:
             score -= 3
         return max(0, score)
@@ -0,0 +1,241 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def tokenize_once(model, texts):
+    """Token ids per text, truncated to the model's max length but not padded"""
+    # Same stripping SentenceTransformer.encode applies before tokenizing
+    return model.tokenizer([text.strip() for text in texts], truncation=True,
+                           max_length=model.max_seq_length, padding=False)
+
+
+def plan_buckets(lengths, max_tokens_per_batch, max_batch_size, max_length_ratio=2.0):
+    """
+    Group indices into batches of similar token length
+
+    Indices are sorted by length and each batch grows while
+    batch_size x longest sequence stays within max_tokens_per_batch and the
+    longest sequence is at most max_length_ratio times the shortest. The
+    ratio is what keeps a long paragraph from padding a batch of short
+    bullet points when all of them would fit the token budget together.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets = []
+    current = []
+
+    for i in order:
+        # Sorted ascending, so the newcomer is the longest in the batch
+        # and current[0] the shortest
+        if current and ((len(current) + 1) * lengths[i] > max_tokens_per_batch or
+                        len(current) >= max_batch_size or
+                        lengths[i] > max_length_ratio * lengths[current[0]]):
+            buckets.append(current)
+            current = []
+        current.append(i)
+
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def encode_length_bucketed(model, texts, max_tokens_per_batch=8192, max_batch_size=128):
+    """
+    Encode texts in length buckets; returns (embeddings, real_tokens, padded_tokens)
+
+    Texts are tokenized once, the ids reused for every forward pass, and
+    the embeddings come back as a numpy array in the original order.
+    Models without a tokenizer fall back to plain model.encode.
+    """
+    if getattr(model, 'tokenizer', None) is None:
+        return model.encode(list(texts), convert_to_numpy=True), 0, 0
+
+    import torch
+
+    encoded = tokenize_once(model, texts)
+    keys = list(encoded.keys())
+    lengths = [len(ids) for ids in encoded['input_ids']]
+    buckets = plan_buckets(lengths, max_tokens_per_batch, max_batch_size)
+
+    embeddings = [None] * len(texts)
+    padded_tokens = 0
+
+    with torch.no_grad():
+        for bucket in buckets:
+            features = model.tokenizer.pad(
+                {key: [encoded[key][i] for i in bucket] for key in keys},
+                return_tensors='pt')
+            features = {key: value.to(model.device) for key, value in features.items()}
+            output = model.forward(features)['sentence_embedding'].cpu().numpy()
+
+            padded_tokens += len(bucket) * max(lengths[i] for i in bucket)
+            for row, i in enumerate(bucket):
+                embeddings[i] = output[row]
+
+    return np.stack(embeddings), sum(lengths), padded_tokens
+
+
+class _EncodeRequest:
+    __slots__ = ('texts', 'future', 'enqueued_at')
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchingEncoder:
+    """
+    Dynamic micro-batching in front of a SentenceTransformer
+
+    Concurrent callers put their texts on a queue; one inference thread
+    collects whatever arrives within max_wait_ms (or until max_batch_size
+    texts are waiting) and encodes them together in length buckets. Each
+    caller gets its own rows back through a future.
+
+    Only helps when requests are served by several threads of the same
+    process (the Flask dev server, or gunicorn with --threads > 1). With a
+    single request thread nothing can join a batch, so serve.py sets
+    max_wait_ms to 0 there; requests already queued are still taken.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=5.0, max_tokens_per_batch=8192,
+                 history=1000):
+        self.model = model
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # Metrics
+        self._metrics_lock = threading.Lock()
+        self._batch_sizes = collections.Counter()
+        self._queue_delays = collections.deque(maxlen=history)
+        self._total_batches = 0
+        self._total_texts = 0
+        self._total_requests = 0
+        self._real_tokens = 0
+        self._padded_tokens = 0
+
+    def encode(self, sentences, convert_to_tensor=False):
+        """Drop-in for model.encode on a string or a list of strings"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        if not texts:
+            return self.model.encode(texts, convert_to_tensor=convert_to_tensor)
+
+        embeddings = self.submit(texts).result()
+        if single:
+            embeddings = embeddings[0]
+
+        if convert_to_tensor:
+            import torch
+            embeddings = torch.from_numpy(embeddings)
+
+        return embeddings
+
+    def submit(self, texts):
+        """Queue texts for encoding and return a future of their embeddings"""
+        self._ensure_worker()
+        request = _EncodeRequest(texts)
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_worker(self):
+        # Started lazily so it also exists in workers forked after model load
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='batch-encoder', daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    request = self._queue.get(timeout=remaining)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+
+            texts = [text for request in batch for text in request.texts]
+            try:
+                embeddings, real_tokens, padded_tokens = encode_length_bucketed(
+                    self.model, texts, self.max_tokens_per_batch)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                n = len(request.texts)
+                request.future.set_result(embeddings[offset:offset + n])
+                offset += n
+
+            with self._metrics_lock:
+                self._total_batches += 1
+                self._total_texts += len(texts)
+                self._total_requests += len(batch)
+                self._batch_sizes[len(texts)] += 1
+                self._real_tokens += real_tokens
+                self._padded_tokens += padded_tokens
+                self._queue_delays.extend(started - request.enqueued_at for request in batch)
+
+    def get_metrics(self):
+        """Batch-size distribution and queueing delay added by batching"""
+        with self._metrics_lock:
+            delays_ms = np.array(self._queue_delays) * 1000
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            total_batches = self._total_batches
+            total_texts = self._total_texts
+            total_requests = self._total_requests
+            real_tokens = self._real_tokens
+            padded_tokens = self._padded_tokens
+
+        if len(delays_ms):
+            delay_stats = {
+                'mean': round(float(delays_ms.mean()), 3),
+                'p50': round(float(np.percentile(delays_ms, 50)), 3),
+                'p95': round(float(np.percentile(delays_ms, 95)), 3),
+                'p99': round(float(np.percentile(delays_ms, 99)), 3),
+                'max': round(float(delays_ms.max()), 3),
+            }
+        else:
+            delay_stats = {}
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'total_batches': total_batches,
+            'total_requests': total_requests,
+            'total_texts': total_texts,
+            'mean_batch_size': round(total_texts / total_batches, 2) if total_batches else 0,
+            'batch_size_distribution': batch_sizes,
+            'queue_delay_ms': delay_stats,
+            'padding_efficiency': round(real_tokens / padded_tokens, 3) if padded_tokens else None,
+        }
@@ -0,0 +1,134 @@
+"""
+Benchmark padding waste in sentence encoding
+
+Encodes a mix of short resume bullet points and long paragraphs three ways
+and reports effective tokens/sec (real, unpadded tokens per second):
+
+    single-batch   everything in one model.encode batch (padded to the longest)
+    st-default     model.encode with batch_size=32
+    bucketed       encode_length_bucketed (tokenize once, length buckets)
+
+Two workloads are measured: a corpus of --texts texts, and a micro-batch
+of --small-batch short bullets plus one long paragraph, the size of a
+batching-encoder batch or a get_top_matching_sentences call, where the
+whole batch fits the token budget and only the length ratio splits it.
+
+Usage:
+    python bench_encoding.py --texts 512 --long-fraction 0.1 --small-batch 30 --repeats 3
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from batch_encoder import encode_length_bucketed, plan_buckets, tokenize_once
+
+WORDS = ('developed designed implemented scalable microservices python docker kubernetes '
+         'react api pipeline machine learning models improved latency led team of engineers '
+         'data analysis sql postgresql aws cloud deployment automated testing ci cd').split()
+
+
+def generate_texts(n, long_fraction, seed):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        words = rng.randint(150, 300) if rng.random() < long_fraction else rng.randint(5, 15)
+        texts.append(' '.join(rng.choice(WORDS) for _ in range(words)))
+    return texts
+
+
+def generate_micro_batch(n, seed):
+    """n short bullets and one long paragraph"""
+    rng = random.Random(seed)
+    texts = generate_texts(n, 0.0, seed)
+    texts.insert(rng.randint(0, n), ' '.join(rng.choice(WORDS) for _ in range(rng.randint(150, 300))))
+    return texts
+
+
+def padded_tokens(lengths, batches):
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+
+
+def timed(fn, repeats):
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - started) / repeats, result
+
+
+def run_workload(model, texts, args):
+    lengths = [len(ids) for ids in tokenize_once(model, texts)['input_ids']]
+    real_tokens = sum(lengths)
+
+    # SentenceTransformer sorts by character length within encode
+    st_order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+    st_batches = [st_order[i:i + 32] for i in range(0, len(st_order), 32)]
+
+    strategies = {
+        'single-batch': (lambda: model.encode(texts, batch_size=len(texts)),
+                         padded_tokens(lengths, [list(range(len(texts)))])),
+        'st-default': (lambda: model.encode(texts, batch_size=32),
+                       padded_tokens(lengths, st_batches)),
+        'bucketed': (lambda: encode_length_bucketed(model, texts, args.max_tokens_per_batch)[0],
+                     padded_tokens(lengths, plan_buckets(lengths, args.max_tokens_per_batch, 128))),
+    }
+
+    results = {}
+    reference = None
+    print(f"{'strategy':>13} {'seconds':>8} {'padded tok':>11} {'efficiency':>11} {'tokens/sec':>11} {'max diff':>9}")
+
+    for name, (fn, padded) in strategies.items():
+        seconds, embeddings = timed(fn, args.repeats)
+        if reference is None:
+            reference = embeddings
+        max_diff = float(np.abs(np.asarray(embeddings) - reference).max())
+
+        results[name] = {
+            'seconds': round(seconds, 4),
+            'real_tokens': real_tokens,
+            'padded_tokens': padded,
+            'padding_efficiency': round(real_tokens / padded, 3),
+            'effective_tokens_per_sec': round(real_tokens / seconds, 1),
+            'max_abs_diff_vs_single_batch': max_diff,
+        }
+        r = results[name]
+        print(f"{name:>13} {r['seconds']:>8.3f} {padded:>11} {r['padding_efficiency']:>11.3f} "
+              f"{r['effective_tokens_per_sec']:>11.1f} {max_diff:>9.2e}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Effective tokens/sec with and without length bucketing')
+    parser.add_argument('--texts', type=int, default=512)
+    parser.add_argument('--long-fraction', type=float, default=0.1)
+    parser.add_argument('--small-batch', type=int, default=30,
+                        help='Short bullets in the micro-batch workload (0 to skip it)')
+    parser.add_argument('--max-tokens-per-batch', type=int, default=8192)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    model = SentenceTransformer(args.model)
+    workloads = {'corpus': generate_texts(args.texts, args.long_fraction, args.seed)}
+    if args.small_batch:
+        workloads['micro-batch'] = generate_micro_batch(args.small_batch, args.seed)
+
+    results = {}
+    for name, texts in workloads.items():
+        print(f"\n{name}: {len(texts)} texts")
+        results[name] = run_workload(model, texts, args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Memory benchmark for the pre-fork serving mode (Linux only)
+
+Starts serve.py with an increasing number of workers and reports RSS and
+PSS for the master and each worker, read from /proc/<pid>/smaps_rollup.
+PSS splits shared pages between the processes mapping them, so with
+preloaded models the per-worker PSS growth should stay small.
+
+Usage:
+    python bench_memory.py --workers 1 2 4 8
+    python bench_memory.py --workers 1 2 4 --no-preload   # baseline
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def read_memory_kb(pid):
+    """Return {'rss': ..., 'pss': ..., 'shared': ..., 'private': ...} in kB"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def child_pids(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_for_workers(proc, port, workers, timeout):
+    deadline = time.time() + timeout
+    url = f'http://127.0.0.1:{port}/api/health'
+
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('Server exited during startup')
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            if len(child_pids(proc.pid)) >= workers:
+                break
+        except OSError:
+            pass
+        time.sleep(0.5)
+    else:
+        raise RuntimeError(f'Server not ready after {timeout}s')
+
+    # Give every worker a few requests so lazily touched pages show up
+    for _ in range(workers * 4):
+        urllib.request.urlopen(url, timeout=5).read()
+
+
+def measure(workers, port, preload, timeout):
+    cmd = [sys.executable, 'serve.py', '--workers', str(workers),
+           '--bind', f'127.0.0.1:{port}']
+    if not preload:
+        cmd.append('--no-preload')
+
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_workers(proc, port, workers, timeout)
+        master = read_memory_kb(proc.pid)
+        worker_stats = [read_memory_kb(pid) for pid in child_pids(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    return {
+        'workers': workers,
+        'preload': preload,
+        'master': master,
+        'worker_rss_kb': [w['rss'] for w in worker_stats],
+        'worker_private_kb': [w['private'] for w in worker_stats],
+        'total_pss_kb': master['pss'] + sum(w['pss'] for w in worker_stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-worker memory growth for serve.py')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--no-preload', action='store_true')
+    parser.add_argument('--timeout', type=int, default=300)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'workers':>8} {'total PSS MB':>13} {'MB/worker added':>16} {'avg worker private MB':>22}")
+
+    for n in args.workers:
+        result = measure(n, args.port, not args.no_preload, args.timeout)
+        results.append(result)
+
+        total_mb = result['total_pss_kb'] / 1024
+        if len(results) > 1:
+            prev = results[-2]
+            growth = (result['total_pss_kb'] - prev['total_pss_kb']) / 1024 / (n - prev['workers'])
+            growth_str = f'{growth:.1f}'
+        else:
+            growth_str = '-'
+        private = result['worker_private_kb']
+        avg_private = sum(private) / len(private) / 1024 if private else 0
+
+        print(f'{n:>8} {total_mb:>13.1f} {growth_str:>16} {avg_private:>22.1f}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Offline bulk screening of resume dumps against one job description
+
+Runs ResumeParser -> SkillExtractor -> BERTResumeMatcher -> ATSScorer ->
+SkillGapAnalyzer over a directory or glob of PDF/DOCX files. Parsing and
+extraction run in a process pool, encoding runs batched in the main
+process. Results are written chunk by chunk to CSV or Parquet and every
+finished chunk is checkpointed, so an interrupted run resumes where it
+stopped.
+
+Usage:
+    python bulk_screen.py resumes/ --jd job.txt --output results.csv
+    python bulk_screen.py "dumps/**/*.pdf" --jd job.txt --output results.parquet --workers 8
+"""
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+
+import pandas as pd
+
+from resume_parser import ResumeParser
+from parsed_resume import ParsedResume
+from skill_extractor import SkillExtractor
+from skill_gap_analyzer import SkillGapAnalyzer
+from ats_scorer import ATSScorer
+
+ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
+
+COLUMNS = [
+    'filename', 'path', 'candidate_name', 'email', 'phone', 'match_score',
+    'bert_semantic_score', 'skill_matching_score', 'ats_score',
+    'ats_contact_information', 'ats_skills_section', 'ats_experience_section',
+    'ats_education_section', 'ats_keyword_optimization', 'ats_format_structure',
+    'skills', 'matched_skills', 'missing_skills', 'gap_percentage',
+    'experience_entries', 'education_entries', 'error'
+]
+
+# Per-process pipeline, set up by _init_worker
+_worker = {}
+
+
+def find_resumes(inputs):
+    """Expand directories and glob patterns into a sorted list of resume paths"""
+    paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*')
+        for path in glob.glob(pattern, recursive=True):
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in ALLOWED_EXTENSIONS:
+                paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+def _init_worker(job_description):
+    _worker['job_description'] = job_description
+    _worker['parser'] = ResumeParser()
+    _worker['extractor'] = SkillExtractor()
+    _worker['ats_scorer'] = ATSScorer()
+    _worker['gap_analyzer'] = SkillGapAnalyzer()
+
+
+def _process_file(path):
+    """Everything except encoding; runs in a pool worker"""
+    row = {'filename': os.path.basename(path), 'path': path, 'error': ''}
+    try:
+        resume_text = _worker['parser'].extract_text(path)
+        parsed = ParsedResume(resume_text)
+        candidate_data = _worker['extractor'].extract_candidate_info(parsed)
+        ats_score, ats_breakdown = _worker['ats_scorer'].calculate_ats_score(parsed, candidate_data)
+        skill_gaps = _worker['gap_analyzer'].identify_gaps(candidate_data['skills'],
+                                                           _worker['job_description'])
+    except Exception as e:
+        row['error'] = str(e)
+        return row, None
+
+    row.update({
+        'candidate_name': candidate_data.get('name', 'Unknown'),
+        'email': candidate_data.get('email', 'N/A'),
+        'phone': str(candidate_data.get('phone', 'N/A')),
+        'skills': '; '.join(sorted(candidate_data.get('skills', []))),
+        'experience_entries': len(candidate_data.get('experience', [])),
+        'education_entries': len(candidate_data.get('education', [])),
+        'ats_score': round(ats_score, 2),
+        'missing_skills': '; '.join(skill_gaps['missing_skills']),
+        'matched_skills': '; '.join(skill_gaps['matched_skills']),
+        'gap_percentage': skill_gaps['gap_percentage'],
+    })
+    for category, score in ats_breakdown.items():
+        row[f'ats_{category}'] = score
+
+    return row, resume_text
+
+
+def run_fingerprint(job_description):
+    """Hash of everything that decides a row's content: the JD and the output columns"""
+    settings = json.dumps({'job_description': job_description, 'columns': COLUMNS}, sort_keys=True)
+    return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+
+class CheckpointMismatch(Exception):
+    pass
+
+
+class Checkpoint:
+    """
+    Append-only log of finished chunks next to the output
+
+    The first line holds the run fingerprint; resuming with a different JD
+    raises CheckpointMismatch instead of mixing rows scored against two JDs
+    in one output. Each further line records the files in a chunk and where
+    the output stood after writing it: the byte size of the CSV, or the
+    name of the Parquet part. Anything written after the last line is
+    discarded on resume.
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.entries = []
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path) as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            recorded = lines[0].get('fingerprint') if lines else None
+            if recorded != fingerprint:
+                raise CheckpointMismatch(
+                    f'{path} was written for a different job description or settings; '
+                    f'use another --output or delete the checkpoint and output to start over')
+            self.entries = lines[1:]
+        else:
+            self._append({'fingerprint': fingerprint})
+
+    def _append(self, entry):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    @property
+    def done(self):
+        return {path for entry in self.entries for path in entry['files']}
+
+    def record(self, files, **position):
+        entry = dict(position, files=files)
+        self._append(entry)
+        self.entries.append(entry)
+
+
+class CsvSink:
+    """Single CSV appended to per chunk, truncated back to the last checkpoint on resume"""
+
+    def __init__(self, path, checkpoint):
+        self.path = path
+        self.checkpoint = checkpoint
+        offset = checkpoint.entries[-1]['offset'] if checkpoint.entries else 0
+        # Drop rows from a chunk that was written but never checkpointed
+        if os.path.exists(path):
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+
+    def write(self, frame):
+        header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='') as f:
+            frame.to_csv(f, index=False, header=header)
+            f.flush()
+            os.fsync(f.fileno())
+            offset = f.tell()
+        return {'offset': offset}
+
+
+class ParquetSink:
+    """One Parquet part file per chunk inside the output directory"""
+
+    def __init__(self, path, checkpoint):
+        self.path = path
+        self.checkpoint = checkpoint
+        os.makedirs(path, exist_ok=True)
+
+        recorded = {entry['part'] for entry in checkpoint.entries}
+        for name in os.listdir(path):
+            if name.endswith('.parquet') and name not in recorded:
+                os.remove(os.path.join(path, name))
+        self.next_part = len(recorded)
+
+    def write(self, frame):
+        name = f'part-{self.next_part:05d}.parquet'
+        tmp_path = os.path.join(self.path, name + '.tmp')
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(self.path, name))
+        self.next_part += 1
+        return {'part': name}
+
+
+def screen(paths, job_description, output, workers, chunk_size, batch_size):
+    parquet = output.endswith('.parquet')
+    try:
+        checkpoint = Checkpoint(output.rstrip('/') + '.checkpoint', run_fingerprint(job_description))
+    except CheckpointMismatch as e:
+        sys.exit(str(e))
+    sink = ParquetSink(output, checkpoint) if parquet else CsvSink(output, checkpoint)
+
+    done = checkpoint.done
+    pending = [path for path in paths if path not in done]
+    print(f"📂 {len(paths)} resumes found, {len(paths) - len(pending)} already screened, "
+          f"{len(pending)} to go")
+    if not pending:
+        return
+
+    # Start the pool before loading BERT so workers don't inherit it
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(job_description,))
+    try:
+        from matcher_bert import BERTResumeMatcher
+        matcher = BERTResumeMatcher()
+
+        processed = 0
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            results = pool.map(_process_file, chunk, chunksize=max(1, len(chunk) // (workers * 4)))
+
+            rows = [row for row, _ in results]
+            ok = [(row, text) for row, text in results if text is not None]
+            scores, breakdowns = matcher.calculate_similarity_batch(
+                [text for _, text in ok], job_description, batch_size)
+            for (row, _), score, breakdown in zip(ok, scores, breakdowns):
+                row['match_score'] = round(score * 100, 2)
+                row['bert_semantic_score'] = breakdown['bert_semantic_score']
+                row['skill_matching_score'] = breakdown['skill_matching_score']
+
+            position = sink.write(pd.DataFrame(rows, columns=COLUMNS))
+            checkpoint.record(chunk, **position)
+
+            processed += len(chunk)
+            print(f"   ✅ {processed}/{len(pending)} screened")
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Screen a directory or glob of resumes against a JD')
+    parser.add_argument('inputs', nargs='+', help='Directories or glob patterns of PDF/DOCX files')
+    parser.add_argument('--jd', required=True, help='Path to a text file with the job description')
+    parser.add_argument('--output', required=True, help='results.csv, or results.parquet (a directory of parts)')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help='Resumes per checkpointed chunk')
+    parser.add_argument('--batch-size', type=int, default=64, help='Encoding batch size')
+    args = parser.parse_args()
+
+    with open(args.jd, encoding='utf-8') as f:
+        job_description = f.read()
+    if not job_description.strip():
+        sys.exit('Job description is empty')
+
+    paths = find_resumes(args.inputs)
+    if not paths:
+        sys.exit('No PDF/DOCX resumes found')
+
+    screen(paths, job_description, args.output, args.workers, args.chunk_size, args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
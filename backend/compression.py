@@ -0,0 +1,84 @@
+import gzip
+
+from flask import request
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/csv'}
+
+
+def _accepted_encodings(header):
+    """Parse Accept-Encoding into {encoding: q}"""
+    accepted = {}
+    for part in header.split(','):
+        pieces = part.strip().split(';')
+        encoding = pieces[0].strip().lower()
+        if not encoding:
+            continue
+        q = 1.0
+        for param in pieces[1:]:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[encoding] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """Best of zstd (when installed) and gzip the client accepts, or None"""
+    accepted = _accepted_encodings(header or '')
+    candidates = (['zstd'] if zstandard is not None else []) + ['gzip']
+
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_body(data, accept_encoding, min_size=1024, gzip_level=6, zstd_level=3):
+    """Compress data per an Accept-Encoding header; returns (data, encoding or None)"""
+    if len(data) < min_size:
+        return data, None
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding == 'zstd':
+        # Compressor objects aren't safe to share across request threads
+        data = zstandard.ZstdCompressor(level=zstd_level).compress(data)
+    elif encoding == 'gzip':
+        data = gzip.compress(data, compresslevel=gzip_level)
+    return data, encoding
+
+
+def init_compression(app, min_size=1024, gzip_level=6, zstd_level=3):
+    """
+    Compress large responses according to Accept-Encoding
+
+    zstd is used when the optional zstandard package is installed and the
+    client accepts it, otherwise gzip. Small, streamed and already-encoded
+    responses pass through untouched.
+    """
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed or
+                response.status_code < 200 or response.status_code >= 300 or
+                'Content-Encoding' in response.headers or
+                response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data, encoding = compress_body(response.get_data(), request.headers.get('Accept-Encoding'),
+                                       min_size, gzip_level, zstd_level)
+        if encoding is None:
+            return response
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -8,8 +8,15 @@ class ExplainableAI:
         """Generate explanation for the match score (backward compatible)"""
         return self.explain_score_with_bert(resume_text, job_description, match_score, None)
     
-    def explain_score_with_bert(self, resume_text, job_description, match_score, matcher):
-        """Enhanced explanation with BERT score breakdown"""
+    def explain_score_with_bert(self, resume_text, job_description, match_score, matcher,
+                                breakdown=None):
+        """
+        Enhanced explanation with BERT score breakdown
+
+        Pass the breakdown that came with match_score; without it the
+        matcher's last breakdown is used, which may belong to another
+        request if the matcher is shared between threads.
+        """
         
         if match_score >= 0.7:
             overall_assessment = "Excellent match"
@@ -25,8 +32,8 @@ class ExplainableAI:
             recommendation = "Not recommended"
         
         # Get BERT score breakdown if available
-        bert_breakdown = {}
-        if matcher and hasattr(matcher, 'get_score_breakdown'):
+        bert_breakdown = breakdown or {}
+        if breakdown is None and matcher and hasattr(matcher, 'get_score_breakdown'):
             try:
                 bert_breakdown = matcher.get_score_breakdown()
             except:
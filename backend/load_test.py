@@ -0,0 +1,547 @@
+"""
+Concurrent load test for the HTTP API
+
+Starts a server locally (Flask dev server, pre-fork gunicorn or the async
+ASGI mode), or targets one already running, then replays a weighted mix of
+requests built from generated DOCX resumes at increasing concurrency:
+
+    single   POST /api/analyze-single with one resume and a target role
+    batch    POST /api/upload-resumes, multipart with --batch-size resumes
+    zip      POST /api/upload-resumes, the same resumes as a raw ZIP body
+
+Each concurrency level is a closed loop: N clients send requests back to
+back for --duration seconds after a --warmup. Throughput, latency
+percentiles and error rate (any non-2xx, 429 counted separately as
+rejected) are written to a JSON report along with the git commit and
+settings, so saturation points can be compared across versions.
+
+With --stub-model the SentenceTransformer is replaced by a hashing encoder
+that costs --stub-ms-per-text per text, which isolates parsing, extraction
+and serving from model compute.
+
+Usage:
+    python load_test.py --server asgi --stub-model --concurrency 1 2 4 8 16 32
+    python load_test.py --server prefork --workers 4 --mix single=3,batch=1,zip=1
+    python load_test.py --url http://127.0.0.1:5000 --output before.json
+"""
+import argparse
+import http.client
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+import zipfile
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+from skill_gap_analyzer import SkillGapAnalyzer
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+REQUEST_KINDS = ('single', 'batch', 'zip')
+VARIANTS_PER_KIND = 20
+
+# Per-client backoff after a connection error, doubling up to the max (seconds)
+CONNECT_BACKOFF_MIN = 0.05
+CONNECT_BACKOFF_MAX = 2.0
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Meera',
+               'John', 'Emily', 'Carlos', 'Sofia', 'Wei', 'Fatima', 'Liam', 'Olivia']
+LAST_NAMES = ['Sharma', 'Patel', 'Gupta', 'Reddy', 'Singh', 'Iyer', 'Smith', 'Garcia',
+              'Chen', 'Khan', 'Brown', 'Nguyen', 'Kumar', 'Lopez', 'Williams', 'Das']
+VERBS = ['Developed', 'Designed', 'Implemented', 'Led', 'Optimized', 'Built', 'Automated',
+         'Migrated', 'Maintained', 'Deployed']
+OBJECTS = ['a REST API serving 2M requests per day', 'data pipelines for analytics',
+           'a microservices platform', 'CI/CD workflows for 12 services',
+           'dashboards for business stakeholders', 'a recommendation engine',
+           'the customer onboarding flow', 'monitoring and alerting', 'a mobile backend',
+           'batch ETL jobs processing 500GB nightly']
+DEGREES = ['B.Tech in Computer Science', 'B.E. in Information Technology',
+           'M.Sc. in Data Science', 'MCA', 'B.Sc. in Mathematics', 'M.Tech in Software Engineering']
+
+
+class StubSentenceModel:
+    """
+    Stand-in for SentenceTransformer that costs a fixed time per text
+
+    Embeddings are hashed bags of words, so scores still vary with overlap.
+    tokenizer is None, so length-bucketed encoding falls back to encode().
+    """
+
+    tokenizer = None
+    dimensions = 384
+
+    def __init__(self, ms_per_text=2.0):
+        self.ms_per_text = ms_per_text
+
+    def _embed(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, convert_to_numpy=True,
+               **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        # Sleeping releases the GIL the way torch kernels do
+        time.sleep(self.ms_per_text * len(texts) / 1000)
+        if texts:
+            embeddings = np.stack([self._embed(text) for text in texts])
+        else:
+            embeddings = np.zeros((0, self.dimensions), dtype=np.float32)
+        if single:
+            embeddings = embeddings[0]
+
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(embeddings)
+        return embeddings
+
+    def eval(self):
+        return self
+
+    def share_memory(self):
+        return self
+
+    def parameters(self):
+        return iter(())
+
+
+def serve(mode, port, workers, stub_ms_per_text):
+    """Run a server in this process; the load test launches itself with --serve"""
+    if stub_ms_per_text is not None:
+        import matcher_bert
+        matcher_bert.SentenceTransformer = lambda name: StubSentenceModel(stub_ms_per_text)
+
+    if mode == 'flask':
+        from app import app
+        app.run(host='127.0.0.1', port=port, threaded=True)
+    elif mode == 'prefork':
+        from serve import PreforkServer
+        PreforkServer({'bind': f'127.0.0.1:{port}', 'workers': workers, 'timeout': 300}).run()
+    else:
+        import uvicorn
+        from asgi_app import app
+        uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning')
+
+
+def start_server(args):
+    cmd = [sys.executable, os.path.abspath(__file__), '--serve', args.server,
+           '--port', str(args.port), '--workers', str(args.workers)]
+    if args.stub_model:
+        cmd += ['--stub-model', '--stub-ms-per-text', str(args.stub_ms_per_text)]
+
+    log = open(args.server_log, 'w') if args.server_log else subprocess.DEVNULL
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=log, stderr=subprocess.STDOUT)
+
+    url = f'http://127.0.0.1:{args.port}'
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('Server exited during startup')
+        try:
+            urllib.request.urlopen(url + '/api/health', timeout=2).read()
+            return proc, url
+        except OSError:
+            time.sleep(0.5)
+
+    proc.terminate()
+    raise RuntimeError(f'Server not ready after {args.startup_timeout}s')
+
+
+# ---------------------------------------------------------------------------
+# Request generation
+
+def generate_resume(rng, skills):
+    """A DOCX resume as bytes, with sections the extractor and ATS scorer look for"""
+    from docx import Document
+
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    document = Document()
+    document.add_paragraph(name)
+    document.add_paragraph(f"{name.lower().replace(' ', '.')}@example.com | "
+                           f"+91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}")
+
+    document.add_paragraph('Skills')
+    document.add_paragraph(', '.join(rng.sample(skills, rng.randint(5, 15))))
+
+    document.add_paragraph('Experience')
+    for _ in range(rng.randint(2, 4)):
+        document.add_paragraph(f'Software Engineer, Company {rng.randint(1, 500)} '
+                               f'({rng.randint(2012, 2020)} - {rng.randint(2021, 2025)})')
+        for _ in range(rng.randint(2, 6)):
+            document.add_paragraph(f'{rng.choice(VERBS)} {rng.choice(OBJECTS)} using '
+                                   f'{rng.choice(skills)} and {rng.choice(skills)}')
+
+    document.add_paragraph('Education')
+    document.add_paragraph(f'{rng.choice(DEGREES)}, University {rng.randint(1, 100)}')
+
+    document.add_paragraph('Projects')
+    for _ in range(rng.randint(1, 3)):
+        document.add_paragraph(f'{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)}')
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def multipart_body(fields, files):
+    """(body, content type) for form fields and (field, filename, data) files"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                     f'{value}\r\n'.encode())
+    for name, filename, data in files:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                     f'filename="{filename}"\r\nContent-Type: {DOCX_MIMETYPE}\r\n\r\n'.encode())
+        parts.append(data)
+        parts.append(b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def build_requests(rng, resumes, roles, batch_size, unique_filenames=False):
+    """
+    Pre-built request variants per kind: (method, path, body, headers, resumes)
+
+    Bodies are built up front so the client spends its time waiting on the
+    server rather than encoding multipart forms. A resume keeps its filename
+    in every request that carries it, as with real clients re-submitting the
+    same file, unless unique_filenames is set.
+    """
+    upload_ids = itertools.count()
+
+    def pick(n):
+        return [(f'resume_{next(upload_ids) if unique_filenames else i}.docx', resumes[i])
+                for i in rng.sample(range(len(resumes)), n)]
+
+    def job_description(role):
+        skills = roles[role]['required'] + roles[role]['preferred']
+        return f"We are hiring a {role}. Required: {', '.join(skills)}. 3+ years of experience."
+
+    variants = {kind: [] for kind in REQUEST_KINDS}
+    batch_size = min(batch_size, len(resumes))
+
+    for _ in range(VARIANTS_PER_KIND):
+        role = rng.choice(sorted(roles))
+        (filename, data), = pick(1)
+        body, content_type = multipart_body({'target_role': role}, [('resume', filename, data)])
+        variants['single'].append(('POST', '/api/analyze-single', body,
+                                   {'Content-Type': content_type}, 1))
+
+        batch = pick(batch_size)
+        body, content_type = multipart_body({'job_description': job_description(role)},
+                                            [('resumes', f, d) for f, d in batch])
+        variants['batch'].append(('POST', '/api/upload-resumes', body,
+                                  {'Content-Type': content_type}, batch_size))
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as z:
+            for filename, data in batch:
+                z.writestr(filename, data)
+        query = urllib.parse.urlencode({'job_description': job_description(role)})
+        variants['zip'].append(('POST', f'/api/upload-resumes?{query}', archive.getvalue(),
+                                {'Content-Type': 'application/zip'}, batch_size))
+
+    return variants
+
+
+def parse_mix(mix):
+    """'single=3,batch=1' -> {'single': 3.0, 'batch': 1.0}"""
+    weights = {}
+    for part in mix.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind '{kind}', expected one of {', '.join(REQUEST_KINDS)}")
+        weights[kind] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError('Request mix has no positive weights')
+    return weights
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+
+class Client(threading.Thread):
+    """One closed-loop client on a keep-alive connection"""
+
+    def __init__(self, url, variants, weights, timeout, stop, records, seed):
+        super().__init__(daemon=True)
+        parsed = urllib.parse.urlparse(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.variants = variants
+        self.kinds = list(weights)
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.timeout = timeout
+        self.stop = stop
+        self.records = records
+        self.rng = random.Random(seed)
+        self.connection = None
+
+    def _send(self, method, path, body, headers):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        self.connection.request(method, path, body, headers)
+        response = self.connection.getresponse()
+        body = response.read()
+        if response.will_close:
+            self.connection.close()
+            self.connection = None
+
+        if 200 <= response.status < 300:
+            return response.status, None
+        return response.status, body[:200].decode('utf-8', 'replace')
+
+    def run(self):
+        backoff = 0
+        while not self.stop.is_set():
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            method, path, body, headers, resumes = self.rng.choice(self.variants[kind])
+
+            started = time.perf_counter()
+            try:
+                status, error = self._send(method, path, body, headers)
+                backoff = 0
+            except (OSError, http.client.HTTPException) as e:
+                status, error = None, f'{type(e).__name__}: {e}'
+                if self.connection is not None:
+                    self.connection.close()
+                    self.connection = None
+                # A refused connection fails in microseconds; don't spin on it
+                backoff = min(max(2 * backoff, CONNECT_BACKOFF_MIN), CONNECT_BACKOFF_MAX)
+            finished = time.perf_counter()
+
+            # list.append is atomic, no lock needed
+            self.records.append((kind, finished, finished - started, status, error, resumes))
+            if status is None:
+                self.stop.wait(backoff)
+
+        if self.connection is not None:
+            self.connection.close()
+
+
+def latency_stats(latencies):
+    if not latencies:
+        return {}
+    ms = np.array(latencies) * 1000
+    return {
+        'mean': round(float(ms.mean()), 2),
+        'p50': round(float(np.percentile(ms, 50)), 2),
+        'p90': round(float(np.percentile(ms, 90)), 2),
+        'p95': round(float(np.percentile(ms, 95)), 2),
+        'p99': round(float(np.percentile(ms, 99)), 2),
+        'max': round(float(ms.max()), 2),
+    }
+
+
+def summarize(records, duration):
+    """
+    Throughput, error rate and latency of successful requests
+
+    Throughput counts requests the server answered; connection failures
+    only count towards the error rate.
+    """
+    answered = [r for r in records if r[3] is not None]
+    ok = [r for r in answered if 200 <= r[3] < 300]
+    rejected = sum(1 for r in records if r[3] == 429)
+
+    status_codes = {}
+    sample_errors = []
+    for record in records:
+        key = str(record[3]) if record[3] is not None else 'connection error'
+        status_codes[key] = status_codes.get(key, 0) + 1
+        if record[4] is not None and record[3] != 429 and len(sample_errors) < 5 \
+                and record[4] not in sample_errors:
+            sample_errors.append(record[4])
+
+    return {
+        'requests': len(records),
+        'throughput_rps': round(len(answered) / duration, 3),
+        'goodput_rps': round(len(ok) / duration, 3),
+        'resumes_per_sec': round(sum(r[5] for r in ok) / duration, 3),
+        'error_rate': round(1 - len(ok) / len(records), 4) if records else 0.0,
+        'rejected_rate': round(rejected / len(records), 4) if records else 0.0,
+        'status_codes': dict(sorted(status_codes.items())),
+        'latency_ms': latency_stats([r[2] for r in ok]),
+        'sample_errors': sample_errors,
+    }
+
+
+def run_level(url, variants, weights, concurrency, warmup, duration, timeout, seed):
+    records = []
+    stop = threading.Event()
+    clients = [Client(url, variants, weights, timeout, stop, records, seed + i)
+               for i in range(concurrency)]
+
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    time.sleep(warmup + duration)
+    stop.set()
+    for client in clients:
+        client.join(timeout)
+
+    # Only requests that finished inside the measurement window count
+    window_start = started + warmup
+    window_end = window_start + duration
+    measured = [r for r in records if window_start <= r[1] < window_end]
+
+    level = {'concurrency': concurrency, **summarize(measured, duration)}
+    level['by_kind'] = {
+        kind: summarize([r for r in measured if r[0] == kind], duration)
+        for kind in weights if weights[kind] > 0
+    }
+    return level
+
+
+def find_saturation(levels, tolerance=0.05):
+    """Lowest concurrency whose goodput is within tolerance of the best level"""
+    if not levels:
+        return None
+    best = max(level['goodput_rps'] for level in levels)
+    for level in levels:
+        if level['goodput_rps'] >= (1 - tolerance) * best:
+            return {
+                'concurrency': level['concurrency'],
+                'goodput_rps': level['goodput_rps'],
+                'resumes_per_sec': level['resumes_per_sec'],
+                'p99_ms': level['latency_ms'].get('p99'),
+            }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput, tail latency and error rate under concurrent load')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--server', choices=['flask', 'prefork', 'asgi'], default='asgi',
+                        help='Server to start locally (default: asgi)')
+    target.add_argument('--url', help='Test an already running server instead of starting one')
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--workers', type=int, default=2, help='Workers for --server prefork')
+    parser.add_argument('--stub-model', action='store_true',
+                        help='Replace the SentenceTransformer with a fixed-cost hashing encoder')
+    parser.add_argument('--stub-ms-per-text', type=float, default=2.0)
+    parser.add_argument('--startup-timeout', type=int, default=300)
+    parser.add_argument('--server-log', help='Write the started server\'s output to this file')
+
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--mix', default='single=3,batch=1',
+                        help='Weighted request kinds, e.g. single=3,batch=1,zip=1')
+    parser.add_argument('--batch-size', type=int, default=10, help='Resumes per batch/zip request')
+    parser.add_argument('--resumes', type=int, default=50, help='Distinct generated resumes')
+    parser.add_argument('--unique-filenames', action='store_true',
+                        help='Name every upload differently instead of by resume, e.g. to '
+                             'load-test servers that store uploads under their filename')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per level')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds per level')
+    parser.add_argument('--cooldown', type=float, default=2, help='Idle seconds between levels')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-request timeout')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='load_test_report.json')
+    parser.add_argument('--serve', choices=['flask', 'prefork', 'asgi'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.workers,
+              args.stub_ms_per_text if args.stub_model else None)
+        return
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    rng = random.Random(args.seed)
+    with open(SkillGapAnalyzer.DEFAULT_CATALOGUE, encoding='utf-8') as f:
+        roles = json.load(f)
+    skills = sorted({skill for spec in roles.values()
+                     for skill in spec['required'] + spec['preferred']})
+
+    print(f'📝 Generating {args.resumes} resumes...')
+    resumes = [generate_resume(rng, skills) for _ in range(args.resumes)]
+    variants = build_requests(rng, resumes, roles, args.batch_size, args.unique_filenames)
+
+    proc = None
+    url = args.url
+    if url is None:
+        print(f"🚀 Starting {args.server} server{' (stub model)' if args.stub_model else ''}...")
+        proc, url = start_server(args)
+
+    levels = []
+    try:
+        print(f"{'clients':>8} {'req/s':>8} {'ok req/s':>9} {'resumes/s':>10} {'errors':>7} "
+              f"{'429':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for concurrency in args.concurrency:
+            level = run_level(url, variants, weights, concurrency, args.warmup, args.duration,
+                              args.timeout, args.seed)
+            levels.append(level)
+
+            latency = level['latency_ms']
+            print(f"{concurrency:>8} {level['throughput_rps']:>8.2f} {level['goodput_rps']:>9.2f} "
+                  f"{level['resumes_per_sec']:>10.2f} {level['error_rate']:>7.1%} "
+                  f"{level['rejected_rate']:>6.1%} {latency.get('p50', 0):>8.1f} "
+                  f"{latency.get('p95', 0):>8.1f} {latency.get('p99', 0):>8.1f}")
+            time.sleep(args.cooldown)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'target': {
+            'url': url,
+            'server': None if args.url else args.server,
+            'workers': args.workers if args.server == 'prefork' and not args.url else None,
+            'model': 'stub' if args.stub_model else 'real',
+            'stub_ms_per_text': args.stub_ms_per_text if args.stub_model else None,
+        },
+        'settings': {
+            'mix': weights,
+            'batch_size': args.batch_size,
+            'resumes': args.resumes,
+            'unique_filenames': args.unique_filenames,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'timeout_s': args.timeout,
+            'seed': args.seed,
+        },
+        'host': {
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'levels': levels,
+        'saturation': find_saturation(levels),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'📄 Report written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
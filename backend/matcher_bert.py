@@ -3,6 +3,9 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 import re
 
+from parsed_resume import ParsedResume
+from batch_encoder import BatchingEncoder, encode_length_bucketed
+
 class BERTResumeMatcher:
     """
     State-of-the-art resume matching using Sentence-BERT
@@ -14,7 +17,7 @@ class BERTResumeMatcher:
     3. Understands context, synonyms, and meaning (not just keywords)
     """
     
-    def __init__(self):
+    def __init__(self, max_batch_size=64, max_wait_ms=5.0):
         # Load pre-trained BERT model
         # 'all-MiniLM-L6-v2' is optimized for semantic similarity
         # First time download: ~80MB, takes 1-2 minutes
@@ -23,9 +26,24 @@ class BERTResumeMatcher:
         
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
         
+        # Concurrent requests share encode calls through one inference thread
+        self.encoder = BatchingEncoder(self.model, max_batch_size, max_wait_ms)
+        
         print("✅ BERT model loaded successfully!")
         print("   Using state-of-the-art semantic matching (90%+ accuracy)")
     
+    def share_memory(self):
+        """
+        Move model weights into shared memory for pre-fork serving
+        
+        Forked workers then map the same physical pages instead of
+        copying them on first touch.
+        """
+        self.model.eval()
+        self.model.share_memory()
+        for param in self.model.parameters():
+            param.requires_grad_(False)
+    
     def preprocess_text(self, text):
         """Light preprocessing - BERT handles most of it"""
         # Remove excessive whitespace
@@ -34,14 +52,28 @@ class BERTResumeMatcher:
         text = re.sub(r'[^\w\s.,]', '', text)
         return text.strip()
     
-    def calculate_similarity(self, resume_text, job_description):
+    def calculate_similarity(self, resume, job_description):
         """
         Main similarity calculation using BERT embeddings
         
+        Accepts raw resume text or a ParsedResume.
         Returns: Float between 0 and 1 (will be converted to percentage)
         """
+        final_score, self.last_breakdown = self.calculate_similarity_with_breakdown(
+            resume, job_description)
+        return final_score
+
+    def calculate_similarity_with_breakdown(self, resume, job_description):
+        """
+        calculate_similarity() returning (score, breakdown)
+
+        Use this when the matcher is shared between threads, where
+        get_score_breakdown() may already hold another request's breakdown.
+        """
+        parsed = ParsedResume.coerce(resume)
+        
         # Preprocess
-        resume_clean = self.preprocess_text(resume_text)
+        resume_clean = self.preprocess_text(parsed.text)
         jd_clean = self.preprocess_text(job_description)
         
         # Truncate if too long (BERT has max length ~512 tokens)
@@ -50,8 +82,9 @@ class BERTResumeMatcher:
         jd_clean = jd_clean[:5000]
         
         # Encode both texts into embeddings (vector representations)
-        resume_embedding = self.model.encode(resume_clean, convert_to_tensor=True)
-        jd_embedding = self.model.encode(jd_clean, convert_to_tensor=True)
+        # in a single submission so they land in the same batch
+        resume_embedding, jd_embedding = self.encoder.encode([resume_clean, jd_clean],
+                                                             convert_to_tensor=True)
         
         # Calculate cosine similarity
         similarity = util.cos_sim(resume_embedding, jd_embedding)
@@ -60,22 +93,55 @@ class BERTResumeMatcher:
         base_score = float(similarity[0][0])
         
         # Apply skill-based boosting for better accuracy
-        skill_boost = self._calculate_skill_boost(resume_text, job_description)
+        skill_boost = self._calculate_skill_boost(parsed, job_description)
         
         # Combine BERT score with skill boost
         # 80% BERT semantic + 20% exact skill matching
         final_score = (0.80 * base_score) + (0.20 * skill_boost)
         
-        # Store breakdown for transparency
-        self.last_breakdown = {
+        # Breakdown for transparency
+        breakdown = {
             'bert_semantic_score': round(base_score * 100, 2),
             'skill_matching_score': round(skill_boost * 100, 2),
             'final_score': round(final_score * 100, 2)
         }
         
-        return final_score
-    
-    def _calculate_skill_boost(self, resume_text, job_description):
+        return final_score, breakdown
+
+    def calculate_similarity_batch(self, resumes, job_description, batch_size=64):
+        """
+        Score many resumes against one JD with batched encoding
+
+        The JD is encoded once and resumes go through the model in length
+        buckets of at most batch_size. Returns (scores, breakdowns) in input order.
+        """
+        parsed_resumes = [ParsedResume.coerce(resume) for resume in resumes]
+        if not parsed_resumes:
+            return [], []
+
+        jd_clean = self.preprocess_text(job_description)[:5000]
+        resume_cleans = [self.preprocess_text(parsed.text)[:5000] for parsed in parsed_resumes]
+
+        jd_embedding = self.model.encode(jd_clean, convert_to_numpy=True)
+        resume_embeddings, _, _ = encode_length_bucketed(self.model, resume_cleans,
+                                                         max_batch_size=batch_size)
+        base_scores = util.cos_sim(resume_embeddings, jd_embedding).flatten().tolist()
+
+        scores = []
+        breakdowns = []
+        for parsed, base_score in zip(parsed_resumes, base_scores):
+            skill_boost = self._calculate_skill_boost(parsed, job_description)
+            final_score = (0.80 * base_score) + (0.20 * skill_boost)
+            scores.append(final_score)
+            breakdowns.append({
+                'bert_semantic_score': round(base_score * 100, 2),
+                'skill_matching_score': round(skill_boost * 100, 2),
+                'final_score': round(final_score * 100, 2)
+            })
+
+        return scores, breakdowns
+
+    def _calculate_skill_boost(self, parsed, job_description):
         """
         Calculate exact skill keyword overlap
         This complements BERT's semantic understanding
@@ -94,7 +160,7 @@ class BERTResumeMatcher:
             'linux', 'bash', 'shell scripting', 'devops', 'terraform', 'ansible'
         ]
         
-        resume_lower = resume_text.lower()
+        resume_lower = parsed.lower
         jd_lower = job_description.lower()
         
         # Find skills in JD
@@ -130,8 +196,8 @@ class BERTResumeMatcher:
             return self.calculate_similarity(resume_text, job_description)
         
         # Encode all sentences
-        sentence_embeddings = self.model.encode(sentences, convert_to_tensor=True)
-        jd_embedding = self.model.encode(job_description, convert_to_tensor=True)
+        embeddings = self.encoder.encode(sentences + [job_description], convert_to_tensor=True)
+        sentence_embeddings, jd_embedding = embeddings[:-1], embeddings[-1]
         
         # Calculate similarity for each sentence
         similarities = util.cos_sim(sentence_embeddings, jd_embedding)
@@ -157,8 +223,8 @@ class BERTResumeMatcher:
             return []
         
         # Encode
-        sentence_embeddings = self.model.encode(sentences, convert_to_tensor=True)
-        jd_embedding = self.model.encode(job_description, convert_to_tensor=True)
+        embeddings = self.encoder.encode(sentences + [job_description], convert_to_tensor=True)
+        sentence_embeddings, jd_embedding = embeddings[:-1], embeddings[-1]
         
         # Calculate similarities
         similarities = util.cos_sim(sentence_embeddings, jd_embedding)
@@ -178,7 +244,7 @@ class BERTResumeMatcher:
         return top_sentences
     
     def get_score_breakdown(self):
-        """Return detailed breakdown of last score calculation"""
+        """Return detailed breakdown of last score calculation (not thread-safe)"""
         if hasattr(self, 'last_breakdown'):
             return self.last_breakdown
         return {}
@@ -0,0 +1,82 @@
+import re
+
+class ParsedResume:
+    """
+    Segmented view of a resume, built once per document
+
+    Holds the lowercase text, the line array and the detected section
+    boundaries so extractors and scorers don't each re-split and
+    re-lowercase the same text.
+    """
+
+    # Lines containing any of these keywords open the section
+    SECTION_KEYWORDS = {
+        'experience': ['experience', 'work history', 'employment'],
+        'education': ['education', 'academic', 'qualification'],
+        'skills': ['skills'],
+        'projects': ['projects']
+    }
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = text.lower()
+        self.lines = text.split('\n')
+        self.lines_lower = [line.lower().strip() for line in self.lines]
+        self.tokens = text.split()
+        self.word_count = len(self.tokens)
+        self.line_count = len(self.lines)
+        self.sections = self._detect_sections()
+
+    @classmethod
+    def coerce(cls, resume):
+        """Accept either raw text or an existing ParsedResume"""
+        if isinstance(resume, cls):
+            return resume
+        return cls(resume)
+
+    def _detect_sections(self):
+        """
+        Find (start, end) line indices for each known section
+
+        A section starts after the first line mentioning one of its keywords
+        and ends at the first later line naming another section.
+        """
+        sections = {}
+
+        for name, keywords in self.SECTION_KEYWORDS.items():
+            stop_words = [other for other in self.SECTION_KEYWORDS if other != name]
+            start = None
+            end = self.line_count
+
+            for i, line_lower in enumerate(self.lines_lower):
+                if any(keyword in line_lower for keyword in keywords):
+                    if start is None:
+                        start = i + 1
+                    continue
+
+                if start is not None and any(word in line_lower for word in stop_words):
+                    end = i
+                    break
+
+            if start is not None:
+                sections[name] = (start, end)
+
+        return sections
+
+    def section_lines(self, name):
+        """Return (line, line_lower) pairs inside a section, skipping header lines"""
+        if name not in self.sections:
+            return []
+
+        start, end = self.sections[name]
+        keywords = self.SECTION_KEYWORDS[name]
+
+        return [
+            (self.lines[i], self.lines_lower[i])
+            for i in range(start, end)
+            if not any(keyword in self.lines_lower[i] for keyword in keywords)
+        ]
+
+    def contains_word(self, word):
+        """Whole-word, case-insensitive search against the normalized text"""
+        return re.search(r'\b' + re.escape(word.lower()) + r'\b', self.lower) is not None
@@ -0,0 +1,163 @@
+import cProfile
+import collections
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+from flask import g, request
+
+PROFILE_HEADER = 'X-Profile-Request'
+
+
+class _StackSampler(threading.Thread):
+    """
+    Samples the stacks of a few threads into collapsed-stack counts
+
+    cProfile only sees the request thread; model.encode runs on the
+    batch-encoder thread, so that one is sampled too, with each stack
+    rooted at its thread name.
+    """
+
+    def __init__(self, targets, interval):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.targets = targets
+        self.interval = interval
+        self.counts = collections.Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, label in self.targets:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                stack.append(label)
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfiler:
+    """
+    Opt-in per-request profiling of Flask endpoint handlers
+
+    PROFILING_MODE is 'off' (default), 'header' (only requests carrying
+    X-Profile-Request: 1) or 'always'. Either way only a
+    PROFILING_SAMPLE_RATE fraction of eligible requests is profiled. Each
+    profiled request leaves three files in PROFILING_DIR: a pstats dump
+    (.prof), a collapsed-stack file for flamegraph.pl/speedscope (.folded)
+    and a .json with the batch size and document sizes.
+
+    Views behind admission control are profiled inside the admission
+    wrapper, so the profile and duration_ms cover the handler only; the
+    time spent queued is recorded separately as admission_wait_ms.
+
+    With the mode off no view function is wrapped at all.
+    """
+
+    def __init__(self, app):
+        self.mode = app.config.get('PROFILING_MODE', 'off')
+        self.sample_rate = float(app.config.get('PROFILING_SAMPLE_RATE', 1.0))
+        self.output_dir = app.config.get('PROFILING_DIR', 'profiles/')
+        self.interval = float(app.config.get('PROFILING_INTERVAL_MS', 5)) / 1000.0
+
+        if self.mode not in ('off', 'header', 'always'):
+            raise ValueError(f"Unknown PROFILING_MODE: {self.mode}")
+
+    def install(self, app, endpoints):
+        """Wrap the given endpoints' view functions; no-op when profiling is off"""
+        if self.mode == 'off':
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        for endpoint in endpoints:
+            view = app.view_functions[endpoint]
+            inner = getattr(view, 'inner_view', None)
+            if inner is not None:
+                app.view_functions[endpoint] = view.with_inner_view(self._wrap(endpoint, inner))
+            else:
+                app.view_functions[endpoint] = self._wrap(endpoint, view)
+
+    def _should_profile(self):
+        if self.mode == 'header' and request.headers.get(PROFILE_HEADER) != '1':
+            return False
+        return random.random() < self.sample_rate
+
+    def _wrap(self, endpoint, view):
+        @functools.wraps(view)
+        def profiled_view(*args, **kwargs):
+            if not self._should_profile():
+                return view(*args, **kwargs)
+
+            metadata = self._request_metadata(endpoint)
+            targets = [(threading.get_ident(), 'request')]
+            targets += [(t.ident, t.name) for t in threading.enumerate() if t.name == 'batch-encoder']
+            sampler = _StackSampler(targets, self.interval)
+            profile = cProfile.Profile()
+
+            started = time.perf_counter()
+            sampler.start()
+            profile.enable()
+            try:
+                response = view(*args, **kwargs)
+            finally:
+                profile.disable()
+                sampler.stop()
+                metadata['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+                metadata['admission_wait_ms'] = g.get('admission_wait_ms')
+                # Raw ZIP bodies are only sized as the handler inflates them
+                if 'archive_document_sizes' in g:
+                    metadata['document_sizes'] = g.archive_document_sizes
+                    metadata['batch_size'] = len(g.archive_document_sizes)
+                try:
+                    self._save(metadata, profile, sampler.counts)
+                except OSError as e:
+                    print(f"⚠️  Could not save profile: {e}")
+
+            return response
+
+        return profiled_view
+
+    def _request_metadata(self, endpoint):
+        document_sizes = []
+        # request.files parses multipart bodies; raw ZIP uploads are sized
+        # by the archive handler instead (g.archive_document_sizes)
+        if request.mimetype == 'multipart/form-data':
+            for _, file in request.files.items(multi=True):
+                file.stream.seek(0, os.SEEK_END)
+                document_sizes.append(file.stream.tell())
+                file.stream.seek(0)
+
+        return {
+            'endpoint': endpoint,
+            'method': request.method,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'content_type': request.mimetype,
+            'content_length': request.content_length,
+            'batch_size': len(document_sizes),
+            'document_sizes': document_sizes,
+        }
+
+    def _save(self, metadata, profile, stack_counts):
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{metadata['endpoint']}-" \
+               f"n{metadata['batch_size']}-{uuid.uuid4().hex[:8]}"
+        base = os.path.join(self.output_dir, name)
+
+        profile.dump_stats(base + '.prof')
+        with open(base + '.folded', 'w') as f:
+            for stack, count in stack_counts.most_common():
+                f.write(f'{stack} {count}\n')
+        with open(base + '.json', 'w') as f:
+            json.dump(metadata, f, indent=2)
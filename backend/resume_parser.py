@@ -1,5 +1,6 @@
 import fitz  # PyMuPDF
 from docx import Document
+import io
 import os
 
 class ResumeParser:
@@ -16,11 +17,25 @@ class ResumeParser:
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
     
-    def _extract_from_pdf(self, pdf_path):
+    def extract_text_from_bytes(self, data, filename):
+        """Extract text from an in-memory file, e.g. a ZIP archive member"""
+        file_extension = os.path.splitext(filename)[1].lower()
+        
+        if file_extension == '.pdf':
+            return self._extract_from_pdf(stream=data)
+        elif file_extension == '.docx':
+            return self._extract_from_docx(io.BytesIO(data))
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
+    def _extract_from_pdf(self, pdf_path=None, stream=None):
         """Extract text from PDF using PyMuPDF"""
         text = ""
         try:
-            doc = fitz.open(pdf_path)
+            if stream is not None:
+                doc = fitz.open(stream=stream, filetype='pdf')
+            else:
+                doc = fitz.open(pdf_path)
             for page in doc:
                 text += page.get_text()
             doc.close()
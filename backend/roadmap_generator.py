@@ -1,87 +1,116 @@
+import copy
+import functools
+import heapq
+import json
+import os
+
 class RoadmapGenerator:
     """Generate personalized learning roadmap"""
-    
-    def __init__(self):
-        self.learning_resources = {
-            'python': {
-                'beginner': ['Python for Everybody (Coursera)', 
-                           'Codecademy Python Course'],
-                'intermediate': ['Real Python Tutorials', 
-                               'Effective Python by Brett Slatkin'],
-            },
-            'machine learning': {
-                'beginner': ['Andrew Ng ML Course (Coursera)',
-                           'Hands-On Machine Learning (Book)'],
-                'intermediate': ['Fast.ai Courses', 'Kaggle Competitions'],
-            },
-            'react': {
-                'beginner': ['React Official Tutorial', 'Scrimba React Course'],
-                'intermediate': ['React - The Complete Guide (Udemy)'],
-            },
-            'docker': {
-                'beginner': ['Docker for Beginners (YouTube)', 'Docker Docs'],
-                'intermediate': ['Docker Deep Dive', 'Docker Compose Tutorial'],
-            },
-            'sql': {
-                'beginner': ['SQL Basics (W3Schools)', 'SQLBolt Tutorial'],
-                'intermediate': ['Mode SQL Tutorial', 'Advanced SQL Queries'],
-            }
-        }
-    
+
+    DEFAULT_CATALOGUE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     'data', 'learning_resources.json')
+
+    def __init__(self, catalogue_path=None, cache_size=256):
+        with open(catalogue_path or self.DEFAULT_CATALOGUE, encoding='utf-8') as f:
+            catalogue = json.load(f)
+
+        self.learning_resources = {}
+        self.time_estimates = {}
+        self.milestones = {}
+        self.prerequisites = {}
+
+        for skill, entry in catalogue.items():
+            skill = skill.lower()
+            if 'resources' in entry:
+                self.learning_resources[skill] = entry['resources']
+            if 'estimated_time' in entry:
+                self.time_estimates[skill] = entry['estimated_time']
+            if 'milestones' in entry:
+                self.milestones[skill] = entry['milestones']
+            self.prerequisites[skill] = [p.lower() for p in entry.get('prerequisites', [])]
+
+        # Roadmaps keyed by frozenset of missing skills; a batch for one JD
+        # only produces a handful of distinct gap sets. Wrapped per instance
+        # rather than decorating the method, so generators don't share (or
+        # outlive via) a class-level cache.
+        self._cached_roadmap = functools.lru_cache(maxsize=cache_size)(self._build_roadmap)
+
     def generate_roadmap(self, skill_gaps):
         """Generate step-by-step learning roadmap"""
         missing_skills = skill_gaps.get('missing_skills', [])
-        
+
         if not missing_skills:
             return {'message': 'No skill gaps!', 'roadmap': []}
-        
+
+        key = frozenset(skill.lower() for skill in missing_skills)
+
+        # Callers get their own copy; the cached roadmap is shared
+        return copy.deepcopy(self._cached_roadmap(key))
+
+    def _build_roadmap(self, missing_skills):
         roadmap = []
-        
-        for i, skill in enumerate(missing_skills, 1):
-            skill_lower = skill.lower()
-            
-            if skill_lower in self.learning_resources:
-                resources = self.learning_resources[skill_lower]
-                roadmap.append({
-                    'priority': i,
-                    'skill': skill,
-                    'estimated_time': self._estimate_time(skill_lower),
-                    'resources': resources,
-                    'milestones': self._get_milestones(skill_lower)
-                })
+
+        for i, skill in enumerate(self._order_skills(missing_skills), 1):
+            if skill in self.learning_resources:
+                resources = self.learning_resources[skill]
             else:
-                roadmap.append({
-                    'priority': i,
-                    'skill': skill,
-                    'estimated_time': '4-8 weeks',
-                    'resources': {
-                        'general': [f'{skill} tutorial on YouTube',
-                                   f'Official {skill} documentation']
-                    },
-                    'milestones': ['Learn basics', 'Build project']
-                })
-        
+                resources = {
+                    'general': [f'{skill} tutorial on YouTube',
+                               f'Official {skill} documentation']
+                }
+
+            roadmap.append({
+                'priority': i,
+                'skill': skill,
+                'prerequisites': [p for p in self.prerequisites.get(skill, [])
+                                  if p in missing_skills],
+                'estimated_time': self._estimate_time(skill),
+                'resources': resources,
+                'milestones': self._get_milestones(skill)
+            })
+
         return {
             'total_skills_to_learn': len(missing_skills),
             'estimated_total_time': f'{len(missing_skills) * 6} weeks',
             'roadmap': roadmap
         }
-    
-    def _estimate_time(self, skill):
-        time_estimates = {
-            'python': '6-8 weeks',
-            'javascript': '6-8 weeks',
-            'react': '4-6 weeks',
-            'machine learning': '8-12 weeks',
-            'docker': '3-4 weeks',
-            'sql': '4-6 weeks'
+
+    def _order_skills(self, missing_skills):
+        """
+        Topologically order skills so prerequisites come first
+
+        Only edges between missing skills matter; anything the candidate
+        already knows is not on the roadmap. Ties are broken alphabetically
+        so the order doesn't depend on set iteration.
+        """
+        pending = {
+            skill: {p for p in self.prerequisites.get(skill, []) if p in missing_skills}
+            for skill in missing_skills
         }
-        return time_estimates.get(skill, '4-8 weeks')
-    
+        dependents = {skill: [] for skill in missing_skills}
+        for skill, prereqs in pending.items():
+            for prereq in prereqs:
+                dependents[prereq].append(skill)
+
+        ready = [skill for skill, prereqs in pending.items() if not prereqs]
+        heapq.heapify(ready)
+        ordered = []
+
+        while ready:
+            skill = heapq.heappop(ready)
+            ordered.append(skill)
+            for dependent in dependents[skill]:
+                pending[dependent].discard(skill)
+                if not pending[dependent]:
+                    heapq.heappush(ready, dependent)
+
+        # A cycle in the catalogue shouldn't drop skills from the roadmap
+        ordered.extend(sorted(skill for skill in missing_skills if skill not in ordered))
+
+        return ordered
+
+    def _estimate_time(self, skill):
+        return self.time_estimates.get(skill, '4-8 weeks')
+
     def _get_milestones(self, skill):
-        milestones = {
-            'python': ['Complete syntax', 'Build 3 projects', 'Learn OOP'],
-            'react': ['Understand Components', 'Master Hooks', 'Build App'],
-            'machine learning': ['ML basics', 'Implement algorithms', 'Deploy model']
-        }
-        return milestones.get(skill, ['Learn basics', 'Build project'])
+        return self.milestones.get(skill, ['Learn basics', 'Build project'])
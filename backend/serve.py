@@ -0,0 +1,84 @@
+"""
+Production serving mode: pre-fork gunicorn workers sharing one copy of the models
+
+The SentenceTransformer and spaCy models are loaded once in the master
+process before forking. Torch weights are moved into shared memory and the
+heap is frozen out of the garbage collector, so workers inherit the pages
+copy-on-write instead of each loading their own copy.
+
+Usage:
+    python serve.py --workers 4 --bind 0.0.0.0:5000
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+
+def _post_fork(server, worker):
+    # N workers each spinning up a full torch thread pool just oversubscribes the cores
+    try:
+        import torch
+        torch.set_num_threads(int(os.environ.get('TORCH_THREADS_PER_WORKER', 1)))
+    except ImportError:
+        pass
+
+
+class PreforkServer(BaseApplication):
+    """Gunicorn application that imports the Flask app (and its models) in the master"""
+
+    def __init__(self, options=None, preload=True):
+        self.options = options or {}
+        self.preload = preload
+        self.application = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+        self.cfg.set('preload_app', self.preload)
+        self.cfg.set('post_fork', _post_fork)
+
+    def load(self):
+        if self.application is None:
+            if self.cfg.threads == 1:
+                # One request thread per worker: no other caller can join an
+                # encode batch, so waiting for one only adds latency
+                os.environ.setdefault('ENCODER_MAX_WAIT_MS', '0')
+            from app import app, matcher
+            if self.preload:
+                matcher.share_memory()
+                # Objects allocated so far are never collected; this keeps the
+                # GC from writing to their headers and un-sharing the pages
+                gc.collect()
+                gc.freeze()
+            self.application = app
+        return self.application
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the resume screening API with pre-forked workers')
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count())))
+    parser.add_argument('--bind', default=os.environ.get('BIND', '0.0.0.0:5000'))
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--timeout', type=int, default=300,
+                        help='Worker timeout in seconds (batch uploads are slow)')
+    parser.add_argument('--no-preload', action='store_true',
+                        help='Load models separately in every worker (for comparison)')
+    args = parser.parse_args()
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'timeout': args.timeout,
+    }
+    PreforkServer(options, preload=not args.no_preload).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import uuid
+
+import numpy as np
+
+
+class SkillCoverageMatrix:
+    """
+    Boolean candidates x skills matrix for one applicant pool
+
+    Built once per batch from SkillExtractor output so pool-wide questions
+    (how rare is each JD skill, which skills co-occur, who has all of X, Y
+    and Z) are single vectorized operations instead of loops over every
+    candidate's skill_gaps on the client.
+    """
+
+    def __init__(self, candidates, candidate_skills, skill_vocabulary, jd_skills=()):
+        self.candidates = list(candidates)
+        self.skills = list(dict.fromkeys(skill.lower() for skill in skill_vocabulary))
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        self.jd_skills = [skill.lower() for skill in jd_skills if skill.lower() in self.skill_index]
+
+        self.matrix = np.zeros((len(self.candidates), len(self.skills)), dtype=bool)
+        for row, skills in enumerate(candidate_skills):
+            columns = [self.skill_index[s.lower()] for s in skills if s.lower() in self.skill_index]
+            self.matrix[row, columns] = True
+
+    @classmethod
+    def from_matrix(cls, candidates, skills, matrix, jd_skills=()):
+        """Rebuild a pool from an already computed matrix (see CandidatePoolStore)"""
+        pool = cls.__new__(cls)
+        pool.candidates = list(candidates)
+        pool.skills = list(skills)
+        pool.skill_index = {skill: i for i, skill in enumerate(pool.skills)}
+        pool.jd_skills = list(jd_skills)
+        pool.matrix = matrix
+        return pool
+
+    def _columns(self, skills):
+        unknown = [skill for skill in skills if skill.lower() not in self.skill_index]
+        if unknown:
+            raise KeyError(f"Unknown skills: {', '.join(unknown)}")
+        return [self.skill_index[skill.lower()] for skill in skills]
+
+    def coverage(self, skills=None):
+        """Candidates having each skill, rarest first"""
+        skills = skills if skills is not None else (self.jd_skills or self.skills)
+        columns = self._columns(skills)
+        counts = self.matrix[:, columns].sum(axis=0)
+        total = max(len(self.candidates), 1)
+
+        return sorted(
+            ({'skill': self.skills[c], 'candidates': int(n), 'coverage': round(n / total * 100, 2)}
+             for c, n in zip(columns, counts)),
+            key=lambda item: item['candidates'])
+
+    def co_occurrence(self, skills=None):
+        """Skills x skills counts of candidates having both; the diagonal is coverage"""
+        skills = skills if skills is not None else (self.jd_skills or self.skills)
+        columns = self._columns(skills)
+        sub = self.matrix[:, columns].astype(np.int32)
+        return {
+            'skills': [self.skills[c] for c in columns],
+            'counts': (sub.T @ sub).tolist()
+        }
+
+    def candidates_with_all(self, skills):
+        """Indices of candidates having every one of the given skills"""
+        columns = self._columns(skills)
+        if not columns:
+            return np.arange(len(self.candidates))
+        return np.flatnonzero(self.matrix[:, columns].all(axis=1))
+
+
+class CandidatePoolStore:
+    """
+    Keeps pools on disk under directory, one <pool_id>.npz each
+
+    Pools live in files rather than process memory so that any server
+    worker can answer for a pool screened by another one. The matrix is
+    bit-packed, and the least recently used pools beyond max_pools are
+    deleted.
+    """
+
+    POOL_ID = re.compile(r'[0-9a-f]{32}')
+
+    def __init__(self, directory, max_pools=50):
+        self.directory = directory
+        self.max_pools = max_pools
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, pool_id):
+        return os.path.join(self.directory, f'{pool_id}.npz')
+
+    def add(self, pool):
+        pool_id = uuid.uuid4().hex
+        meta = json.dumps({'candidates': pool.candidates, 'skills': pool.skills,
+                           'jd_skills': pool.jd_skills})
+        path = self._path(pool_id)
+        # Written aside and renamed, so readers never see a partial file
+        with open(path + '.tmp', 'wb') as f:
+            np.savez(f, bits=np.packbits(pool.matrix, axis=1),
+                     columns=np.array(pool.matrix.shape[1]), meta=np.array(meta))
+        os.replace(path + '.tmp', path)
+        self._evict()
+        return pool_id
+
+    def get(self, pool_id):
+        if not self.POOL_ID.fullmatch(pool_id):
+            return None
+        path = self._path(pool_id)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                bits, columns, meta = data['bits'], int(data['columns']), json.loads(str(data['meta']))
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        matrix = np.unpackbits(bits, axis=1, count=columns).astype(bool)
+        return SkillCoverageMatrix.from_matrix(meta['candidates'], meta['skills'], matrix,
+                                               meta['jd_skills'])
+
+    def _evict(self):
+        pools = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                try:
+                    pools.append((os.stat(os.path.join(self.directory, name)).st_mtime, name))
+                except FileNotFoundError:
+                    pass  # evicted by another worker meanwhile
+        pools.sort(reverse=True)
+        for _, name in pools[self.max_pools:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
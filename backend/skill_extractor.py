@@ -1,6 +1,8 @@
 import spacy
 import re
 
+from parsed_resume import ParsedResume
+
 class SkillExtractor:
     """Extract structured information from resume text using NLP"""
     
@@ -34,28 +36,35 @@ class SkillExtractor:
         for category, skills in self.skill_keywords.items():
             self.all_skills.extend(skills)
     
-    def extract_candidate_info(self, resume_text):
-        """Extract name, email, phone, skills, experience, education"""
-        doc = self.nlp(resume_text)
+    def extract_candidate_info(self, resume):
+        """Extract name, email, phone, skills, experience, education
+        
+        Accepts raw text or a ParsedResume shared with the other scorers.
+        """
+        parsed = ParsedResume.coerce(resume)
+        doc = self.nlp(parsed.text)
         
         return {
-            'name': self._extract_name(doc, resume_text),
-            'email': self._extract_email(resume_text),
-            'phone': self._extract_phone(resume_text),
-            'skills': self._extract_skills(resume_text),
-            'experience': self._extract_experience(doc, resume_text),
-            'education': self._extract_education(doc, resume_text)
+            'name': self._extract_name(doc, parsed),
+            'email': self._extract_email(parsed.text),
+            'phone': self._extract_phone(parsed.text),
+            'skills': self._extract_skills(parsed),
+            'experience': self._extract_experience(doc, parsed),
+            'education': self._extract_education(doc, parsed)
         }
     
-    def _extract_name(self, doc, text):
+    def extract_skills(self, text):
+        """Skills mentioned in any text, e.g. a job description"""
+        return self._extract_skills(ParsedResume.coerce(text))
+    
+    def _extract_name(self, doc, parsed):
         """Extract candidate name using NER"""
         for ent in doc.ents:
             if ent.label_ == 'PERSON':
                 return ent.text
         
         # Fallback: assume first line is name
-        lines = text.split('\n')
-        for line in lines[:5]:
+        for line in parsed.lines[:5]:
             line = line.strip()
             if line and len(line.split()) >= 2 and len(line) < 50:
                 return line
@@ -74,67 +83,35 @@ class SkillExtractor:
         phones = re.findall(phone_pattern, text)
         return phones[0] if phones else "N/A"
     
-    def _extract_skills(self, text):
+    def _extract_skills(self, parsed):
         """Extract technical and soft skills"""
-        text_lower = text.lower()
         found_skills = []
         
         for skill in self.all_skills:
-            pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            if re.search(pattern, text_lower):
+            if parsed.contains_word(skill):
                 found_skills.append(skill)
         
         return list(set(found_skills))
     
-    def _extract_experience(self, doc, text):
+    def _extract_experience(self, doc, parsed):
         """Extract work experience sections"""
         experience = []
-        lines = text.split('\n')
+        date_pattern = r'\b(19|20)\d{2}\b'
         
-        exp_keywords = ['experience', 'work history', 'employment']
-        in_experience_section = False
-        
-        for line in lines:
-            line_lower = line.lower().strip()
-            
-            if any(keyword in line_lower for keyword in exp_keywords):
-                in_experience_section = True
-                continue
-            
-            if in_experience_section and any(keyword in line_lower for keyword in 
-                                            ['education', 'skills', 'projects']):
-                break
-            
-            if in_experience_section and line.strip():
-                date_pattern = r'\b(19|20)\d{2}\b'
-                if re.search(date_pattern, line):
-                    experience.append(line.strip())
+        for line, line_lower in parsed.section_lines('experience'):
+            if line.strip() and re.search(date_pattern, line):
+                experience.append(line.strip())
         
         return experience[:5]
     
-    def _extract_education(self, doc, text):
+    def _extract_education(self, doc, parsed):
         """Extract education information"""
         education = []
-        lines = text.split('\n')
-        
-        edu_keywords = ['education', 'academic', 'qualification']
         degree_keywords = ['b.tech', 'b.e.', 'm.tech', 'm.s.', 'mba', 'phd', 
                           'bachelor', 'master', 'diploma']
         
-        in_education_section = False
-        
-        for line in lines:
-            line_lower = line.lower().strip()
-            
-            if any(keyword in line_lower for keyword in edu_keywords):
-                in_education_section = True
-                continue
-            
-            if in_education_section and any(keyword in line_lower for keyword in 
-                                           ['experience', 'skills', 'projects']):
-                break
-            
-            if in_education_section and any(degree in line_lower for degree in degree_keywords):
+        for line, line_lower in parsed.section_lines('education'):
+            if any(degree in line_lower for degree in degree_keywords):
                 education.append(line.strip())
         
         return education[:3]
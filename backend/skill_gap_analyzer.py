@@ -1,29 +1,59 @@
+import json
+import os
+
+import numpy as np
+
 class SkillGapAnalyzer:
     """Identify skill gaps between candidate and job requirements"""
     
-    def __init__(self):
+    DEFAULT_CATALOGUE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     'data', 'roles.json')
+    
+    def __init__(self, catalogue_path=None):
+        with open(catalogue_path or self.DEFAULT_CATALOGUE, encoding='utf-8') as f:
+            catalogue = json.load(f)
+        
         self.role_skills = {
-            'software engineer': {
-                'required': ['python', 'java', 'git', 'sql', 'data structures'],
-                'preferred': ['docker', 'kubernetes', 'aws', 'react', 'node.js']
-            },
-            'data scientist': {
-                'required': ['python', 'machine learning', 'pandas', 'numpy', 'sql'],
-                'preferred': ['tensorflow', 'pytorch', 'deep learning', 'nlp', 'tableau']
-            },
-            'full stack developer': {
-                'required': ['javascript', 'react', 'node.js', 'sql', 'html', 'css'],
-                'preferred': ['mongodb', 'express', 'docker', 'aws', 'typescript']
-            },
-            'devops engineer': {
-                'required': ['docker', 'kubernetes', 'jenkins', 'git', 'linux'],
-                'preferred': ['terraform', 'ansible', 'aws', 'python']
-            },
-            'frontend developer': {
-                'required': ['javascript', 'html', 'css', 'react'],
-                'preferred': ['typescript', 'webpack', 'sass']
+            role.lower(): {
+                'required': [skill.lower() for skill in spec.get('required', [])],
+                'preferred': [skill.lower() for skill in spec.get('preferred', [])]
             }
+            for role, spec in catalogue.items()
         }
+        
+        self._build_index()
+    
+    def _build_index(self):
+        """Encode the catalogue as dense role x skill matrices"""
+        self.roles = list(self.role_skills)
+        
+        skills = set()
+        for requirements in self.role_skills.values():
+            skills.update(requirements['required'])
+            skills.update(requirements['preferred'])
+        self.skills = sorted(skills)
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        
+        self.required_matrix = np.zeros((len(self.roles), len(self.skills)), dtype=np.float32)
+        self.preferred_matrix = np.zeros_like(self.required_matrix)
+        
+        for r, role in enumerate(self.roles):
+            for skill in self.role_skills[role]['required']:
+                self.required_matrix[r, self.skill_index[skill]] = 1
+            for skill in self.role_skills[role]['preferred']:
+                self.preferred_matrix[r, self.skill_index[skill]] = 1
+        
+        self.required_counts = self.required_matrix.sum(axis=1)
+        self.preferred_counts = self.preferred_matrix.sum(axis=1)
+    
+    def _skill_vector(self, candidate_skills):
+        """One-hot vector of the candidate's skills over the catalogue vocabulary"""
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        for skill in candidate_skills:
+            i = self.skill_index.get(skill.lower())
+            if i is not None:
+                vector[i] = 1
+        return vector
     
     def identify_gaps(self, candidate_skills, job_description):
         """Identify missing skills from job description"""
@@ -50,6 +80,28 @@ class SkillGapAnalyzer:
                                    if required_skills else 0, 2)
         }
     
+    def _readiness(self, vector):
+        matched = self.required_matrix @ vector
+        return np.where(self.required_counts > 0,
+                        matched / np.maximum(self.required_counts, 1) * 100, 100.0)
+    
+    def best_fit_roles(self, candidate_skills, top_k=5):
+        """Return the top-k roles by readiness along with their gaps"""
+        if top_k < 1:
+            raise ValueError('top_k must be a positive integer')
+        
+        vector = self._skill_vector(candidate_skills)
+        readiness = self._readiness(vector)
+        
+        # Break readiness ties by preferred-skill coverage
+        preferred = (self.preferred_matrix @ vector) / np.maximum(self.preferred_counts, 1)
+        order = np.lexsort((-preferred, -readiness))[:top_k]
+        
+        return [
+            self.identify_gaps_by_role(candidate_skills, self.roles[r])
+            for r in order
+        ]
+    
     def identify_gaps_by_role(self, candidate_skills, target_role):
         """Identify gaps based on predefined role requirements"""
         role_lower = target_role.lower()
@@ -58,7 +110,7 @@ class SkillGapAnalyzer:
             return {'error': 'Role not found'}
         
         requirements = self.role_skills[role_lower]
-        candidate_skills_lower = [skill.lower() for skill in candidate_skills]
+        candidate_skills_lower = {skill.lower() for skill in candidate_skills}
         
         missing_required = [skill for skill in requirements['required'] 
                            if skill not in candidate_skills_lower]
@@ -74,5 +126,5 @@ class SkillGapAnalyzer:
             'readiness_score': round(
                 (len(requirements['required']) - len(missing_required)) / 
                 len(requirements['required']) * 100, 2
-            )
+            ) if requirements['required'] else 100.0
         }
@@ -0,0 +1,202 @@
+"""
+Tests for the document-counted admission controller in admission.py
+
+Waiting callers run on threads (or as asyncio tasks) and the tests poll
+get_stats() until they are queued, so ordering doesn't depend on sleeps.
+
+Run with pytest, or directly: python test_admission.py
+"""
+import asyncio
+import threading
+import time
+
+from flask import Flask
+
+from admission import AdmissionController, AdmissionRejected, admission_controlled, INTERACTIVE, BULK
+
+
+def make_controller(max_documents=4, interactive_reserved=1, max_queued=10, queue_timeout=5.0):
+    return AdmissionController(max_documents, interactive_reserved,
+                               {INTERACTIVE: max_queued, BULK: max_queued}, queue_timeout)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not reached')
+        time.sleep(0.005)
+
+
+def queued(controller, lane):
+    return controller.get_stats()['queued_documents'][lane]
+
+
+class Waiter(threading.Thread):
+    """Acquires on a thread, recording the order in which waiters got in"""
+
+    def __init__(self, controller, lane, documents, admitted_order):
+        super().__init__(daemon=True)
+        self.controller = controller
+        self.lane = lane
+        self.documents = documents
+        self.admitted_order = admitted_order
+        self.permits = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.permits = self.controller.acquire(self.lane, self.documents)
+            self.admitted_order.append(self.lane)
+        except AdmissionRejected as e:
+            self.error = e
+
+
+def test_interactive_lane_goes_first():
+    controller = make_controller(max_documents=2, interactive_reserved=1)
+    held = controller.acquire(INTERACTIVE, 2)
+    order = []
+
+    bulk = Waiter(controller, BULK, 1, order)
+    bulk.start()
+    wait_until(lambda: queued(controller, BULK) == 1)
+    interactive = Waiter(controller, INTERACTIVE, 1, order)
+    interactive.start()
+    wait_until(lambda: queued(controller, INTERACTIVE) == 1)
+
+    # One permit frees up: the interactive waiter takes it despite queueing later
+    controller.release(INTERACTIVE, 1, 1)
+    interactive.join(5)
+    assert order == [INTERACTIVE]
+
+    controller.release(INTERACTIVE, held - 1, 1)
+    bulk.join(5)
+    assert order == [INTERACTIVE, BULK]
+
+
+def test_reserved_permits_are_kept_from_bulk():
+    controller = make_controller(max_documents=4, interactive_reserved=1, queue_timeout=0.2)
+    assert controller.acquire(BULK, 3) == 3
+
+    try:
+        controller.acquire(BULK, 1)
+    except AdmissionRejected as e:
+        assert e.lane == BULK
+    else:
+        raise AssertionError('bulk request took a reserved permit')
+
+    assert controller.acquire(INTERACTIVE, 1) == 1
+    assert controller.get_stats()['in_flight'] == {INTERACTIVE: 1, BULK: 3}
+
+
+def test_queue_bound_rejects_without_waiting():
+    controller = make_controller(max_documents=2, interactive_reserved=1, max_queued=3)
+    controller.acquire(BULK, 1)
+    waiter = Waiter(controller, BULK, 2, [])
+    waiter.start()
+    wait_until(lambda: queued(controller, BULK) == 2)
+
+    started = time.monotonic()
+    try:
+        controller.acquire(BULK, 2)
+    except AdmissionRejected as e:
+        assert e.retry_after >= 1
+    else:
+        raise AssertionError('queue bound not enforced')
+    assert time.monotonic() - started < 1
+    assert controller.get_stats()['rejected'][BULK] == 1
+
+    controller.release(BULK, 1, 1)
+    waiter.join(5)
+    assert waiter.permits == 1
+
+
+def test_oversized_request_counts_real_documents():
+    controller = make_controller(max_documents=4, interactive_reserved=1, max_queued=5)
+    # Bigger than both the lane and its queue, but the queue is empty
+    permits = controller.acquire(BULK, 50)
+    assert permits == 3
+
+    stats = controller.get_stats()
+    assert stats['in_flight'][BULK] == 3
+    assert stats['in_flight_documents'][BULK] == 50
+
+    controller.release(BULK, permits, 50, elapsed=50.0)
+    stats = controller.get_stats()
+    assert stats['in_flight'][BULK] == 0 and stats['in_flight_documents'][BULK] == 0
+    # 0.9 * 1.0 + 0.1 * (50 s / 50 documents)
+    assert stats['seconds_per_document'] == 1.0
+
+
+def test_timeout_answers_429_with_retry_after():
+    controller = make_controller(max_documents=1, interactive_reserved=0, queue_timeout=0.1)
+    app = Flask(__name__)
+
+    @app.route('/work')
+    @admission_controlled(controller, INTERACTIVE)
+    def work():
+        return 'done'
+
+    client = app.test_client()
+    assert client.get('/work').data == b'done'
+
+    controller.acquire(INTERACTIVE, 1)
+    response = client.get('/work')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['lane'] == INTERACTIVE
+    assert queued(controller, INTERACTIVE) == 0
+
+
+def test_async_waiter_is_woken_by_release():
+    controller = make_controller(max_documents=1, interactive_reserved=0)
+    controller.acquire(INTERACTIVE, 1)
+
+    async def scenario():
+        task = asyncio.ensure_future(controller.acquire_async(INTERACTIVE, 1))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        # Released from another thread, as a Flask worker would
+        threading.Thread(target=controller.release, args=(INTERACTIVE, 1, 1)).start()
+        return await asyncio.wait_for(task, 5)
+
+    assert asyncio.run(scenario()) == 1
+    assert controller.get_stats()['in_flight'][INTERACTIVE] == 1
+
+
+def test_async_timeout_and_cancellation_leave_the_queue():
+    controller = make_controller(max_documents=1, interactive_reserved=0, queue_timeout=0.1)
+    controller.acquire(INTERACTIVE, 1)
+
+    async def scenario():
+        try:
+            await controller.acquire_async(INTERACTIVE, 1)
+        except AdmissionRejected:
+            pass
+        else:
+            raise AssertionError('timed out wait was admitted')
+
+        controller.queue_timeout = 5
+        task = asyncio.ensure_future(controller.acquire_async(INTERACTIVE, 2))
+        await asyncio.sleep(0.05)
+        assert queued(controller, INTERACTIVE) == 2
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(scenario())
+    stats = controller.get_stats()
+    assert stats['queued_documents'][INTERACTIVE] == 0
+    assert stats['in_flight'][INTERACTIVE] == 1
+    assert stats['rejected'][INTERACTIVE] == 1
+
+
+if __name__ == '__main__':
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith('test_') and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f'   ✅ {name}')
+    print(f'\n✅ {len(tests)} admission tests passed')
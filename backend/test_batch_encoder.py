@@ -0,0 +1,114 @@
+"""
+Tests for length-bucketed encoding in batch_encoder.py
+
+A fake model stands in for the SentenceTransformer: its tokenizer maps
+each word to one id, and its embedding of a text (sum of ids, number of
+real tokens) ignores padding, so results can be checked exactly and every
+forward pass records the padded shape it was given.
+
+Run with pytest, or directly: python test_batch_encoder.py
+"""
+import numpy as np
+import torch
+
+from batch_encoder import encode_length_bucketed, plan_buckets
+
+
+class FakeTokenizer:
+    def __call__(self, texts, truncation=True, max_length=512, padding=False):
+        input_ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {'input_ids': input_ids, 'attention_mask': [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, features, return_tensors='pt'):
+        longest = max(len(ids) for ids in features['input_ids'])
+        return {key: torch.tensor([row + [0] * (longest - len(row)) for row in rows])
+                for key, rows in features.items()}
+
+
+class FakeModel:
+    max_seq_length = 512
+    device = 'cpu'
+
+    def __init__(self):
+        self.tokenizer = FakeTokenizer()
+        self.forward_shapes = []
+
+    def forward(self, features):
+        ids, mask = features['input_ids'], features['attention_mask']
+        self.forward_shapes.append(tuple(ids.shape))
+        embedding = torch.stack([(ids * mask).sum(dim=1), mask.sum(dim=1)], dim=1)
+        return {'sentence_embedding': embedding.float()}
+
+
+def expected_embedding(text):
+    lengths = [len(word) for word in text.split()]
+    return [sum(lengths), len(lengths)]
+
+
+def padding_efficiency(lengths, buckets):
+    return sum(lengths) / sum(len(bucket) * max(lengths[i] for i in bucket) for bucket in buckets)
+
+
+def test_long_text_gets_its_own_bucket_within_the_token_budget():
+    # Fits 8192 tokens as one batch, but would pad 30 bullets to 200 tokens
+    lengths = [10] * 30 + [200]
+    buckets = plan_buckets(lengths, max_tokens_per_batch=8192, max_batch_size=128)
+    assert sorted(map(len, buckets)) == [1, 30]
+    assert padding_efficiency(lengths, buckets) == 1.0
+
+    lengths = [10] * 20 + [256]
+    assert padding_efficiency(lengths, plan_buckets(lengths, 8192, 128)) == 1.0
+
+
+def test_similar_lengths_share_a_bucket():
+    lengths = [8, 12, 9, 15, 10, 11]
+    assert plan_buckets(lengths, 8192, 128) == [[0, 2, 4, 5, 1, 3]]
+
+
+def test_token_budget_and_batch_size_still_split():
+    assert list(map(len, plan_buckets([100] * 10, max_tokens_per_batch=400, max_batch_size=128))) == [4, 4, 2]
+    assert list(map(len, plan_buckets([10] * 10, max_tokens_per_batch=8192, max_batch_size=3))) == [3, 3, 3, 1]
+
+
+def test_every_index_planned_once():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(1, 300, size=500).tolist()
+    buckets = plan_buckets(lengths, 8192, 128)
+    assert sorted(i for bucket in buckets for i in bucket) == list(range(500))
+    for bucket in buckets:
+        assert len(bucket) * max(lengths[i] for i in bucket) <= 8192
+        assert max(lengths[i] for i in bucket) <= 2 * min(lengths[i] for i in bucket)
+
+
+def test_encode_restores_input_order():
+    bullets = [f'led team of {n} engineers' for n in range(30)]
+    paragraph = ' '.join(['developed scalable microservices'] * 70)
+    texts = bullets[:12] + [paragraph] + bullets[12:]
+
+    model = FakeModel()
+    embeddings, real_tokens, padded_tokens = encode_length_bucketed(model, texts)
+
+    assert embeddings.tolist() == [expected_embedding(text) for text in texts]
+    assert sorted(model.forward_shapes) == [(1, 210), (30, 5)]
+    assert real_tokens == padded_tokens == 30 * 5 + 210
+
+
+def test_model_without_tokenizer_falls_back_to_encode():
+    class Plain:
+        tokenizer = None
+
+        def encode(self, texts, convert_to_numpy=True):
+            return np.array([[len(text)] for text in texts])
+
+    embeddings, real_tokens, padded_tokens = encode_length_bucketed(Plain(), ['a', 'bbb'])
+    assert embeddings.tolist() == [[1], [3]]
+    assert (real_tokens, padded_tokens) == (0, 0)
+
+
+if __name__ == '__main__':
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith('test_') and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f'   ✅ {name}')
+    print(f'\n✅ {len(tests)} batch encoder tests passed')
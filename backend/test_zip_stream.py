@@ -0,0 +1,188 @@
+"""
+Regression tests for the streaming ZIP reader in zip_stream.py
+
+Archives are built with zipfile, both into a seekable buffer (sizes in the
+local headers) and into a non-seekable stream (sizes only in trailing data
+descriptors), and read back through a stream that returns a few bytes per
+read so members straddle chunk boundaries.
+
+Run with pytest, or directly: python test_zip_stream.py
+"""
+import io
+import random
+import struct
+import zipfile
+
+from zip_stream import iter_zip_members, ZipStreamError
+
+MAX_MEMBER_SIZE = 64 * 1024
+
+
+class Unseekable(io.RawIOBase):
+    """Write-only sink without tell/seek, so zipfile falls back to data descriptors"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+class Trickle:
+    """Read-only stream handing out at most chunk bytes per read"""
+
+    def __init__(self, data, chunk=7):
+        self.data = data
+        self.offset = 0
+        self.chunk = chunk
+
+    def read(self, n):
+        n = min(n, self.chunk)
+        data = self.data[self.offset:self.offset + n]
+        self.offset += len(data)
+        return data
+
+
+def build_archive(members, compression=zipfile.ZIP_DEFLATED, seekable=True, zip64=False):
+    sink = io.BytesIO() if seekable else Unseekable()
+    with zipfile.ZipFile(sink, 'w', compression) as archive:
+        for name, data in members:
+            info = zipfile.ZipInfo(name)
+            info.compress_type = compression
+            with archive.open(info, 'w', force_zip64=zip64) as f:
+                f.write(data)
+    return bytes(sink.getvalue() if seekable else sink.buffer)
+
+
+def read_members(archive, chunk=7, max_member_size=MAX_MEMBER_SIZE, allowed_extensions=None):
+    return list(iter_zip_members(Trickle(archive, chunk), max_member_size, allowed_extensions))
+
+
+def sample_members():
+    rng = random.Random(0)
+    return [
+        ('resume1.pdf', b'%PDF-1.4 resume one ' * 200),
+        ('nested/resume2.docx', bytes(rng.getrandbits(8) for _ in range(5000))),
+        ('empty.pdf', b''),
+        # Contains the data descriptor signature, which must not end the member early
+        ('tricky.pdf', b'before PK\x07\x08 after' * 50),
+    ]
+
+
+def assert_round_trip(archive):
+    members = read_members(archive)
+    assert [(m.filename, m.data, m.error) for m in members] == \
+        [(name, data, None) for name, data in sample_members()]
+
+
+def test_stored_seekable():
+    assert_round_trip(build_archive(sample_members(), zipfile.ZIP_STORED))
+
+
+def test_deflated_seekable():
+    assert_round_trip(build_archive(sample_members(), zipfile.ZIP_DEFLATED))
+
+
+def test_stored_non_seekable():
+    archive = build_archive(sample_members(), zipfile.ZIP_STORED, seekable=False)
+    assert_round_trip(archive)
+
+
+def test_deflated_non_seekable():
+    archive = build_archive(sample_members(), zipfile.ZIP_DEFLATED, seekable=False)
+    assert_round_trip(archive)
+
+
+def test_zip64():
+    for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        for seekable in (True, False):
+            assert_round_trip(build_archive(sample_members(), compression, seekable, zip64=True))
+
+
+def test_large_chunks():
+    archive = build_archive(sample_members(), zipfile.ZIP_STORED, seekable=False)
+    assert [m.error for m in read_members(archive, chunk=1 << 20)] == [None] * 4
+
+
+def test_allowed_extensions_and_directories():
+    archive = build_archive([('folder/', b''), ('notes.txt', b'hello'),
+                             ('__MACOSX/._resume.pdf', b'junk'), ('resume.PDF', b'pdf')])
+    members = read_members(archive, allowed_extensions={'pdf', 'docx'})
+    assert [(m.filename, m.data) for m in members] == [('resume.PDF', b'pdf')]
+
+
+def test_oversized_member_is_skipped():
+    big = b'x' * (MAX_MEMBER_SIZE + 1)
+    for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        for seekable in (True, False):
+            archive = build_archive([('big.pdf', big), ('ok.pdf', b'fine')], compression, seekable)
+            big_member, ok_member = read_members(archive)
+            assert big_member.data is None and 'exceeds' in big_member.error
+            assert (ok_member.filename, ok_member.data, ok_member.error) == ('ok.pdf', b'fine', None)
+
+
+def test_decompression_bomb_is_bounded():
+    # ~100x compression, and without header sizes the limit is only hit while inflating
+    bomb = b'\0' * (MAX_MEMBER_SIZE * 100)
+    archive = build_archive([('bomb.pdf', bomb), ('ok.pdf', b'fine')], seekable=False)
+    assert len(archive) < MAX_MEMBER_SIZE
+    bomb_member, ok_member = read_members(archive, chunk=4096)
+    assert bomb_member.data is None and 'exceeds' in bomb_member.error
+    assert ok_member.data == b'fine'
+
+
+def test_encrypted_member_is_skipped():
+    archive = bytearray(build_archive([('secret.pdf', b'secret'), ('ok.pdf', b'fine')]))
+    flags_offset = 6  # general purpose flags in the first local header
+    flags = struct.unpack_from('<H', archive, flags_offset)[0]
+    struct.pack_into('<H', archive, flags_offset, flags | 0x01)
+
+    secret, ok = read_members(bytes(archive))
+    assert secret.data is None and 'Encrypted' in secret.error
+    assert ok.data == b'fine'
+
+
+def test_crc_mismatch_is_reported():
+    for seekable in (True, False):
+        archive = bytearray(build_archive([('resume.pdf', b'original data'), ('ok.pdf', b'fine')],
+                                          zipfile.ZIP_STORED, seekable))
+        index = archive.index(b'original data')
+        archive[index] ^= 0xFF
+
+        corrupt, ok = read_members(bytes(archive))
+        assert corrupt.data is None and corrupt.error == 'CRC mismatch'
+        assert ok.data == b'fine'
+
+
+def test_truncated_archive_raises():
+    for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        for seekable in (True, False):
+            archive = build_archive(sample_members(), compression, seekable)
+            # Cut inside the second member's data
+            cut = archive.index(b'nested/resume2.docx') + 100
+            try:
+                read_members(archive[:cut])
+            except ZipStreamError:
+                continue
+            raise AssertionError(f'truncated archive accepted ({compression}, seekable={seekable})')
+
+
+def test_not_a_zip_raises():
+    try:
+        read_members(b'%PDF-1.4 definitely not a zip')
+    except ZipStreamError:
+        return
+    raise AssertionError('non-ZIP input accepted')
+
+
+if __name__ == '__main__':
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith('test_') and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f'   ✅ {name}')
+    print(f'\n✅ {len(tests)} ZIP stream tests passed')
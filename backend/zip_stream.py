@@ -0,0 +1,278 @@
+import struct
+import zlib
+
+LOCAL_HEADER = b'PK\x03\x04'
+CENTRAL_HEADER = b'PK\x01\x02'
+END_OF_CENTRAL_DIR = b'PK\x05\x06'
+ZIP64_END_OF_CENTRAL_DIR = b'PK\x06\x06'
+DATA_DESCRIPTOR = b'PK\x07\x08'
+
+STORED = 0
+DEFLATED = 8
+
+FLAG_ENCRYPTED = 0x01
+FLAG_DATA_DESCRIPTOR = 0x08
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ZipStreamError(ValueError):
+    """Archive is malformed or uses a feature the stream reader can't handle"""
+
+
+class ZipMember:
+    """One archive entry; data is None when the member was skipped"""
+
+    def __init__(self, filename, data=None, error=None):
+        self.filename = filename
+        self.data = data
+        self.error = error
+
+
+class _StreamReader:
+    """Exact-size reads over a non-seekable stream with push-back"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = b''
+
+    def read(self, n):
+        """Up to n bytes; fewer only at end of stream"""
+        while len(self.buffer) < n:
+            chunk = self.stream.read(max(CHUNK_SIZE, n - len(self.buffer)))
+            if not chunk:
+                break
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:n], self.buffer[n:]
+        return data
+
+    def read_exact(self, n):
+        data = self.read(n)
+        if len(data) != n:
+            raise ZipStreamError('Unexpected end of archive')
+        return data
+
+    def read_chunk(self):
+        if self.buffer:
+            data, self.buffer = self.buffer, b''
+            return data
+        return self.stream.read(CHUNK_SIZE)
+
+    def unread(self, data):
+        self.buffer = data + self.buffer
+
+
+def iter_zip_members(stream, max_member_size, allowed_extensions=None):
+    """
+    Yield ZipMember objects from a ZIP archive as it is read from a stream
+
+    Walks local file headers in order instead of the central directory, so
+    the archive never needs to be seekable or fully buffered. At most one
+    member (capped at max_member_size bytes uncompressed) is held in memory
+    at a time; larger members are drained and reported with an error.
+    """
+    reader = _StreamReader(stream)
+
+    while True:
+        signature = reader.read(4)
+        if not signature or signature in (CENTRAL_HEADER, END_OF_CENTRAL_DIR,
+                                          ZIP64_END_OF_CENTRAL_DIR):
+            # Central directory only repeats what we've already seen
+            return
+        if signature != LOCAL_HEADER:
+            raise ZipStreamError('Not a ZIP archive or corrupt local header')
+
+        (_, flags, method, _, _, crc, compressed_size, size,
+         name_length, extra_length) = struct.unpack('<HHHHHIIIHH', reader.read_exact(26))
+        raw_name = reader.read_exact(name_length)
+        extra = reader.read_exact(extra_length)
+        filename = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+
+        zip64 = compressed_size == 0xFFFFFFFF or size == 0xFFFFFFFF
+        if zip64:
+            size, compressed_size = _zip64_sizes(extra, size, compressed_size)
+
+        has_descriptor = bool(flags & FLAG_DATA_DESCRIPTOR)
+        length_known = not has_descriptor or compressed_size > 0
+        if method not in (STORED, DEFLATED):
+            raise ZipStreamError(f'{filename}: unsupported compression method {method}')
+
+        wanted = not filename.endswith('/') and not filename.startswith('__MACOSX/')
+        if wanted and allowed_extensions is not None:
+            extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+            wanted = extension in allowed_extensions
+
+        error = None
+        if flags & FLAG_ENCRYPTED:
+            error = 'Encrypted members are not supported'
+        elif length_known and size > max_member_size:
+            error = f'Member exceeds {max_member_size} bytes'
+        keep = wanted and error is None
+
+        max_size = max_member_size if keep else -1
+        if length_known or method == DEFLATED:
+            # Deflate marks its own end even when the header has no sizes
+            data, actual_crc, too_large = _read_member_data(
+                reader, method, compressed_size if length_known else None, max_size)
+            if has_descriptor:
+                crc = _read_data_descriptor(reader, zip64)
+        else:
+            data, actual_crc, too_large, crc = _read_stored_until_descriptor(
+                reader, max_size, zip64)
+
+        if not wanted:
+            continue
+        if error is None and too_large:
+            error = f'Member exceeds {max_member_size} bytes'
+        if error is None and actual_crc != crc:
+            error = 'CRC mismatch'
+
+        yield ZipMember(filename, None if error else data, error)
+
+
+def _zip64_sizes(extra, size, compressed_size):
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, length = struct.unpack('<HH', extra[offset:offset + 4])
+        body = extra[offset + 4:offset + 4 + length]
+        if header_id == 0x0001:
+            fields = iter(struct.unpack(f'<{len(body) // 8}Q', body[:len(body) // 8 * 8]))
+            if size == 0xFFFFFFFF:
+                size = next(fields)
+            if compressed_size == 0xFFFFFFFF:
+                compressed_size = next(fields)
+            return size, compressed_size
+        offset += 4 + length
+    raise ZipStreamError('Missing ZIP64 extra field')
+
+
+def _read_member_data(reader, method, compressed_size, max_size):
+    """
+    Read one member's data; returns (data, crc32, too_large)
+
+    compressed_size is None when only the deflate stream itself marks the
+    end. With max_size == -1 the data is drained and discarded.
+    """
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == DEFLATED else None
+    remaining = compressed_size
+    keep = max_size >= 0
+    parts = []
+    total = 0
+    crc = 0
+    too_large = False
+
+    while remaining is None or remaining > 0:
+        chunk = reader.read_chunk()
+        if not chunk:
+            raise ZipStreamError('Unexpected end of archive')
+        if remaining is not None:
+            if len(chunk) > remaining:
+                reader.unread(chunk[remaining:])
+                chunk = chunk[:remaining]
+            remaining -= len(chunk)
+
+            # Known length: a discarded member can be skipped without inflating it
+            if not keep:
+                continue
+
+        for output in _inflate(decompressor, chunk):
+            if not keep:
+                continue
+            total += len(output)
+            if total > max_size:
+                too_large = True
+                keep = False
+                parts = []
+                continue
+            crc = zlib.crc32(output, crc)
+            parts.append(output)
+
+        if decompressor is not None and decompressor.eof and remaining is None:
+            reader.unread(decompressor.unused_data)
+            break
+
+    if too_large or max_size < 0:
+        return None, None, too_large
+    return b''.join(parts), crc, False
+
+
+def _inflate(decompressor, chunk):
+    if decompressor is None:
+        yield chunk
+        return
+    # Bounded output per call so a decompression bomb can't blow up memory
+    yield decompressor.decompress(chunk, CHUNK_SIZE)
+    while decompressor.unconsumed_tail and not decompressor.eof:
+        yield decompressor.decompress(decompressor.unconsumed_tail, CHUNK_SIZE)
+
+
+def _read_stored_until_descriptor(reader, max_size, zip64):
+    """
+    Read a stored member whose size only appears in its trailing data descriptor
+
+    Scans for a descriptor signature whose recorded size matches the number
+    of bytes seen so far. Returns (data, crc32, too_large, descriptor_crc).
+    """
+    size_format = '<Q' if zip64 else '<I'
+    descriptor_length = 8 + 2 * struct.calcsize(size_format)
+    pending = bytearray()
+    offset = 0
+    parts = []
+    total = 0
+    crc = 0
+    keep = max_size >= 0
+    too_large = False
+
+    while True:
+        chunk = reader.read_chunk()
+        if not chunk:
+            raise ZipStreamError('Unexpected end of archive')
+        pending += chunk
+
+        search_from = 0
+        committable = len(pending) - (descriptor_length - 1)
+        end = None
+        while True:
+            index = pending.find(DATA_DESCRIPTOR, search_from)
+            if index < 0:
+                break
+            if index + descriptor_length > len(pending):
+                committable = min(committable, index)
+                break
+            recorded_size = struct.unpack_from(size_format, pending, index + 8)[0]
+            if recorded_size == offset + index:
+                end = index
+                break
+            search_from = index + 1
+
+        if end is not None:
+            committable = end
+        if committable > 0:
+            data = bytes(pending[:committable])
+            del pending[:committable]
+            offset += committable
+            if keep:
+                total += len(data)
+                if total > max_size:
+                    too_large = True
+                    keep = False
+                    parts = []
+                else:
+                    crc = zlib.crc32(data, crc)
+                    parts.append(data)
+
+        if end is not None:
+            descriptor_crc = struct.unpack_from('<I', pending, 4)[0]
+            reader.unread(bytes(pending[descriptor_length:]))
+            if too_large or max_size < 0:
+                return None, None, too_large, descriptor_crc
+            return b''.join(parts), crc, False, descriptor_crc
+
+
+def _read_data_descriptor(reader, zip64):
+    size_bytes = 16 if zip64 else 8
+    first = reader.read_exact(4)
+    if first == DATA_DESCRIPTOR:
+        first = reader.read_exact(4)
+    reader.read_exact(size_bytes)
+    return struct.unpack('<I', first)[0]